@@ -1,22 +1,46 @@
-from fastapi import APIRouter, Depends, HTTPException
+import math
+import time
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Optional
 
+from fastapi import APIRouter, Depends, HTTPException, Request
+
+from app.core.capture import ModelCallCapture, TrafficRecorder
+from app.core.scheduler import QuotaExceeded, TurnScheduler
 from app.core.session_manager import SessionManager
+from app.core.templates import TemplateRegistry
 from app.models.agents import (
     ChatRequest,
     ChatResponse,
     CreateAgentRequest,
     CreateAgentResponse,
     ListAgentsResponse,
+    ListTemplatesResponse,
+    TemplateSummary,
+    ToolOutputStats,
+    TenantMetricsResponse,
 )
 from app.server.config import Settings
 from app.server.dependencies import (
     get_agent_factory,
     get_session_manager,
     get_settings,
+    get_template_registry,
+    get_tenant,
+    get_traffic_recorder,
+    get_turn_scheduler,
+    is_admin,
 )
+from app.server.responses import MSGPACK_MEDIA_TYPE, negotiate
+from src.profiling import TurnProfiler
 
 router = APIRouter()
 
+# Endpoints returning potentially large payloads also speak msgpack when the
+# client sends `Accept: application/msgpack`.
+MSGPACK_RESPONSES = {200: {"content": {MSGPACK_MEDIA_TYPE: {}}}}
+
 
 @router.post("/agents", response_model=CreateAgentResponse)
 async def create_agent_endpoint(
@@ -24,38 +48,152 @@ async def create_agent_endpoint(
     settings: Settings = Depends(get_settings),
     factory: callable = Depends(get_agent_factory),
     manager: SessionManager = Depends(get_session_manager),
+    tenant: str = Depends(get_tenant),
+    recorder: Optional[TrafficRecorder] = Depends(get_traffic_recorder),
+    registry: TemplateRegistry = Depends(get_template_registry),
 ):
     try:
+        registry.check(body.agent_template)
         agent_runnable, agent_type = factory(body.agent_template, settings)
-        agent_id = manager.create_session(agent_runnable, agent_type)
+        agent_id = manager.create_session(agent_runnable, agent_type, tenant)
+        if recorder is not None:
+            recorder.record(
+                "create_agent",
+                agent_id=agent_id,
+                tenant=tenant,
+                agent_template=body.agent_template,
+            )
         return CreateAgentResponse(agent_id=agent_id)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@router.get("/agents", response_model=ListAgentsResponse)
-async def list_agents(manager: SessionManager = Depends(get_session_manager)):
-    return ListAgentsResponse(agents=manager.list_sessions())
+@router.get(
+    "/agents", response_model=ListAgentsResponse, responses=MSGPACK_RESPONSES
+)
+async def list_agents(
+    request: Request,
+    manager: SessionManager = Depends(get_session_manager),
+    tenant: str = Depends(get_tenant),
+):
+    agents = manager.list_sessions(tenant)
+    return negotiate(request, ListAgentsResponse(agents=agents))
 
 
 @router.delete("/agents/{agent_id}")
 async def delete_agent(
-    agent_id: str, manager: SessionManager = Depends(get_session_manager)
+    agent_id: str,
+    manager: SessionManager = Depends(get_session_manager),
+    tenant: str = Depends(get_tenant),
+    recorder: Optional[TrafficRecorder] = Depends(get_traffic_recorder),
 ):
-    if not manager.delete_session(agent_id):
+    if not manager.delete_session(agent_id, tenant):
         raise HTTPException(status_code=404, detail="Agent not found")
+    if recorder is not None:
+        recorder.record("delete_agent", agent_id=agent_id, tenant=tenant)
     return {"status": "deleted", "agent_id": agent_id}
 
 
-@router.post("/agents/{agent_id}/chat", response_model=ChatResponse)
+@router.get("/agents/{agent_id}/tool-outputs", response_model=ToolOutputStats)
+async def tool_output_stats(
+    agent_id: str,
+    manager: SessionManager = Depends(get_session_manager),
+    tenant: str = Depends(get_tenant),
+):
+    session = manager.get_session(agent_id, tenant)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Agent not found")
+    return ToolOutputStats(agent_id=agent_id, **session.tool_output_stats())
+
+
+@router.post(
+    "/agents/{agent_id}/chat",
+    response_model=ChatResponse,
+    response_model_exclude_none=True,
+    responses=MSGPACK_RESPONSES,
+)
 async def chat_with_agent(
     agent_id: str,
     body: ChatRequest,
+    request: Request,
+    profile: bool = False,
+    admin: bool = Depends(is_admin),
+    settings: Settings = Depends(get_settings),
     manager: SessionManager = Depends(get_session_manager),
+    tenant: str = Depends(get_tenant),
+    scheduler: TurnScheduler = Depends(get_turn_scheduler),
+    recorder: Optional[TrafficRecorder] = Depends(get_traffic_recorder),
 ):
-    session = manager.get_session(agent_id)
+    if profile and not admin:
+        raise HTTPException(status_code=403, detail="Profiling requires admin key")
+
+    session = manager.get_session(agent_id, tenant)
     if session is None:
         raise HTTPException(status_code=404, detail="Agent not found")
 
-    reply = await session.chat(body.message)
-    return ChatResponse(reply=reply, agent_id=agent_id)
+    # Callbacks are only attached when profiling or capturing, so plain turns
+    # run exactly as before.
+    profiler = TurnProfiler() if profile else None
+    capture = ModelCallCapture() if recorder is not None else None
+    callbacks = [cb for cb in (profiler, capture) if cb is not None] or None
+
+    started = time.time()
+    status = 200
+    try:
+        async with scheduler.turn(tenant, body.priority) as ticket:
+            with profiler or nullcontext():
+                reply = await session.chat(body.message, callbacks=callbacks)
+            ticket.tokens = session.last_turn_tokens
+    except QuotaExceeded as e:
+        status = 429
+        raise HTTPException(
+            status_code=429,
+            detail=str(e),
+            headers={"Retry-After": str(math.ceil(e.retry_after))},
+        )
+    except Exception:
+        status = 500
+        raise
+    finally:
+        if recorder is not None:
+            recorder.record_chat(
+                agent_id, tenant, body.message, body.priority, started, status, capture
+            )
+
+    if profiler is None:
+        return negotiate(request, ChatResponse(reply=reply, agent_id=agent_id))
+
+    collapsed = profiler.collapsed()
+    if settings.PROFILE_DIR:
+        profile_dir = Path(settings.PROFILE_DIR)
+        profile_dir.mkdir(parents=True, exist_ok=True)
+        (profile_dir / f"{agent_id}-{time.time_ns()}.folded").write_text(collapsed)
+    return negotiate(
+        request, ChatResponse(reply=reply, agent_id=agent_id, profile=collapsed)
+    )
+
+
+@router.get("/templates", response_model=ListTemplatesResponse)
+async def list_templates(
+    registry: TemplateRegistry = Depends(get_template_registry),
+):
+    return ListTemplatesResponse(
+        templates=[
+            TemplateSummary(
+                name=info.name,
+                agent_type=info.agent_type,
+                compile_seconds=info.compile_seconds,
+            )
+            for info in registry.ready()
+        ]
+    )
+
+
+@router.get("/tenants/metrics", response_model=TenantMetricsResponse)
+async def tenant_metrics(
+    admin: bool = Depends(is_admin),
+    scheduler: TurnScheduler = Depends(get_turn_scheduler),
+):
+    if not admin:
+        raise HTTPException(status_code=403, detail="Metrics require admin key")
+    return TenantMetricsResponse(tenants=scheduler.metrics())
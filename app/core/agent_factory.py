@@ -1,19 +1,48 @@
 import importlib
-from typing import Tuple
+import inspect
+from typing import Optional, Tuple
 
+from langchain_core.language_models import BaseChatModel
 from langchain_core.runnables import Runnable
 
 from app.server.config import Settings
+from src.backends import BlobStore
+from src.serde import make_serializer
+from src.tool_outputs import ToolOutputOffloader
 
 
-def agent_factory(agent_template: str, settings: Settings) -> Tuple[Runnable, str]:
+def agent_factory(
+    agent_template: str, settings: Settings, model: Optional[BaseChatModel] = None
+) -> Tuple[Runnable, str]:
+    # Built before the import below so a serializer error is not reported as
+    # a missing template.
+    checkpoint_serde = make_serializer(
+        settings.CHECKPOINT_SERDE, settings.CHECKPOINT_COMPRESS_THRESHOLD
+    )
     try:
         module_path = f"src.agents.{agent_template}"
         agent_module = importlib.import_module(module_path)
         create_runnable_func = getattr(agent_module, "create_agent_runnable")
 
-        # Assuming create_agent_runnable functions take google_api_key
-        return create_runnable_func(settings.GOOGLE_API_KEY)
+        # Assuming create_agent_runnable functions take google_api_key.
+        # Optional features are only passed when enabled and accepted by the
+        # template, so templates that don't know about them keep working.
+        options = {}
+        if model is not None:
+            options["model"] = model
+        if settings.LLM_HEDGING:
+            options["hedged"] = True
+        if checkpoint_serde is not None:
+            options["checkpoint_serde"] = checkpoint_serde
+        if settings.DEEPAGENT_BLOB_DIR:
+            options["blob_store"] = BlobStore(settings.DEEPAGENT_BLOB_DIR)
+        if settings.TOOL_OUTPUT_MAX_CHARS is not None:
+            options["tool_output_offloader"] = ToolOutputOffloader(
+                BlobStore(settings.TOOL_OUTPUT_DIR), settings.TOOL_OUTPUT_MAX_CHARS
+            )
+        accepted = inspect.signature(create_runnable_func).parameters
+        options = {k: v for k, v in options.items() if k in accepted}
+        return create_runnable_func(settings.GOOGLE_API_KEY, **options)
     except (ImportError, AttributeError) as e:
         raise ValueError(
             f"Could not find create_agent_runnable for template: {agent_template}"
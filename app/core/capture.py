@@ -0,0 +1,112 @@
+import json
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import message_to_dict
+
+
+class ModelCallCapture(BaseCallbackHandler):
+    """Collects every model response of one turn, with its latency."""
+
+    run_inline = True
+
+    def __init__(self):
+        self.calls: List[Dict[str, Any]] = []
+        self._started: Dict[UUID, float] = {}
+
+    def on_chat_model_start(
+        self, serialized: Dict[str, Any], messages: Any, *, run_id: UUID, **kwargs
+    ) -> None:
+        self._started[run_id] = time.monotonic()
+
+    def on_llm_end(
+        self,
+        response: Any,
+        *,
+        run_id: UUID,
+        parent_run_id: Optional[UUID] = None,
+        **kwargs: Any,
+    ) -> None:
+        started = self._started.pop(run_id, None)
+        if parent_run_id in self._started:
+            # A call nested in another model call (a hedge) is part of it.
+            return
+        latency = time.monotonic() - started if started is not None else 0.0
+        message = response.generations[0][0].message
+        self.calls.append({"latency": latency, "message": message_to_dict(message)})
+
+
+class TrafficRecorder:
+    """
+    Appends API traffic to a JSONL trace for offline replay.
+
+    One line per event: "create_agent", "delete_agent" or "chat", each
+    with the tenant that made the request. Chat lines carry the model
+    responses of the turn so a replay can serve them from a fake model. `ts`
+    is the wall-clock time the request arrived; the replay tool only uses
+    the differences between events.
+
+    `record` only queues the event. A background thread encodes and writes
+    it, so request handlers never block on the disk and the recorded
+    latencies are not inflated by the recording itself.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._queue: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue()
+        self._file = open(path, "a", encoding="utf-8")
+        self._writer = threading.Thread(
+            target=self._write, name="traffic-recorder", daemon=True
+        )
+        self._writer.start()
+
+    def record(self, event: str, ts: Optional[float] = None, **fields: Any) -> None:
+        entry = {"event": event, "ts": ts if ts is not None else time.time()}
+        self._queue.put({**entry, **fields})
+
+    def _write(self) -> None:
+        while True:
+            entry = self._queue.get()
+            if entry is None:
+                self._file.close()
+                self._queue.task_done()
+                return
+            self._file.write(json.dumps(entry, default=str) + "\n")
+            # Flush once the backlog is written rather than per line.
+            if self._queue.empty():
+                self._file.flush()
+            self._queue.task_done()
+
+    def flush(self) -> None:
+        """Block until every recorded event is on disk."""
+        self._queue.join()
+
+    def close(self) -> None:
+        self._queue.put(None)
+        self._writer.join()
+
+    def record_chat(
+        self,
+        agent_id: str,
+        tenant: str,
+        message: str,
+        priority: str,
+        started: float,
+        status: int,
+        capture: Optional[ModelCallCapture],
+    ) -> None:
+        self.record(
+            "chat",
+            ts=started,
+            agent_id=agent_id,
+            tenant=tenant,
+            message=message,
+            priority=priority,
+            duration=time.time() - started,
+            status=status,
+            model_calls=capture.calls if capture is not None else [],
+        )
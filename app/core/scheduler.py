@@ -0,0 +1,257 @@
+import asyncio
+import itertools
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Deque, Dict, Optional
+
+from app.server.config import Settings, TenantConfig
+
+DEFAULT_TENANT = "default"
+# Lower value is served first; batch turns only run when no interactive
+# turn is waiting for a free slot.
+PRIORITIES = {"interactive": 0, "batch": 1}
+
+
+class QuotaExceeded(Exception):
+    def __init__(self, tenant: str, reason: str, retry_after: float = 1.0):
+        super().__init__(f"Tenant '{tenant}' {reason}")
+        # Never 0, which would invite an immediate retry into the same 429.
+        self.retry_after = max(1.0, retry_after)
+
+
+class TokenBucket:
+    """
+    Per-minute token quota.
+
+    Usage is only known after a turn, so each admitted turn reserves an
+    estimate up front and `settle` swaps it for the real usage afterwards.
+    Reservations count against `available`, so concurrent turns cannot all
+    be admitted against the same tokens. The bucket may go negative; the
+    tenant is then rejected until it refills.
+    """
+
+    def __init__(self, tokens_per_minute: int):
+        self.capacity = float(tokens_per_minute)
+        self.rate = tokens_per_minute / 60.0
+        self.tokens = self.capacity
+        self.reserved = 0.0
+        self._last = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def available(self) -> float:
+        self._refill()
+        return self.tokens - self.reserved
+
+    def reserve(self, tokens: float) -> None:
+        self.reserved += tokens
+
+    def settle(self, reserved: float, used: int) -> None:
+        self._refill()
+        self.reserved -= reserved
+        self.tokens -= used
+
+    def seconds_until_positive(self) -> float:
+        return max(0.0, -self.available()) / self.rate if self.rate else 60.0
+
+
+@dataclass
+class _Waiter:
+    future: asyncio.Future
+    seq: int
+
+
+@dataclass
+class _TenantState:
+    config: TenantConfig
+    bucket: Optional[TokenBucket]
+    queues: Dict[int, Deque[_Waiter]] = field(
+        default_factory=lambda: {p: deque() for p in PRIORITIES.values()}
+    )
+    active: int = 0
+    # Virtual finish time of the tenant's last granted turn (WFQ tag).
+    finish: float = 0.0
+    wait_times: Deque[float] = field(default_factory=lambda: deque(maxlen=1024))
+    turn_times: Deque[float] = field(default_factory=lambda: deque(maxlen=1024))
+    turn_tokens: Deque[int] = field(default_factory=lambda: deque(maxlen=32))
+    turns: int = 0
+    tokens: int = 0
+    rejected: int = 0
+
+    def queued(self) -> int:
+        return sum(len(q) for q in self.queues.values())
+
+    def can_run(self) -> bool:
+        limit = self.config.max_concurrency
+        return limit is None or self.active < limit
+
+    def estimate_tokens(self) -> float:
+        # Mean of recent turns. Until a turn has finished there is nothing to
+        # go on, so the first turn reserves the whole bucket.
+        capacity = self.bucket.capacity
+        if not self.turn_tokens:
+            return capacity
+        return min(capacity, sum(self.turn_tokens) / len(self.turn_tokens))
+
+
+@dataclass
+class TurnTicket:
+    """Handed to the caller for the duration of a turn; set `tokens` before exit."""
+
+    tokens: int = 0
+
+
+def _quantile(samples: Deque[float], q: float) -> Optional[float]:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class TurnScheduler:
+    """
+    Weighted fair queuing of agent turns across tenants.
+
+    Every turn takes one of `max_concurrent_turns` slots (unlimited when
+    None). When slots are contended, the waiting turn with the highest
+    priority class wins, then the tenant with the smallest virtual finish
+    time (start-time fair queuing, each turn costing 1/weight). A tenant
+    never runs more than its `max_concurrency` turns at once, and never
+    above its `max_priority` class. Each admitted turn reserves the tenant's
+    recent mean tokens per turn; a tenant whose bucket has nothing left
+    after reservations is rejected before it queues.
+    """
+
+    def __init__(
+        self,
+        tenants: Optional[Dict[str, TenantConfig]] = None,
+        max_concurrent_turns: Optional[int] = None,
+    ):
+        self.max_concurrent_turns = max_concurrent_turns
+        self._configs = dict(tenants or {})
+        self._tenants: Dict[str, _TenantState] = {}
+        self._active = 0
+        self._virtual_time = 0.0
+        self._seq = itertools.count()
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "TurnScheduler":
+        return cls(settings.TENANTS, settings.MAX_CONCURRENT_TURNS)
+
+    def _tenant(self, name: str) -> _TenantState:
+        state = self._tenants.get(name)
+        if state is None:
+            config = self._configs.get(name) or TenantConfig()
+            bucket = (
+                TokenBucket(config.tokens_per_minute)
+                if config.tokens_per_minute is not None
+                else None
+            )
+            state = self._tenants[name] = _TenantState(config=config, bucket=bucket)
+        return state
+
+    def _dispatch(self) -> None:
+        limit = self.max_concurrent_turns
+        while limit is None or self._active < limit:
+            best = None
+            for state in self._tenants.values():
+                if not state.can_run():
+                    continue
+                for priority, queue in state.queues.items():
+                    if queue:
+                        start = max(self._virtual_time, state.finish)
+                        key = (priority, start, queue[0].seq)
+                        if best is None or key < best[0]:
+                            best = (key, state, queue)
+                        break
+            if best is None:
+                return
+            (_, start, _), state, queue = best
+            waiter = queue.popleft()
+            self._virtual_time = start
+            state.finish = start + 1.0 / state.config.weight
+            state.active += 1
+            self._active += 1
+            waiter.future.set_result(None)
+
+    def _release(self, state: _TenantState) -> None:
+        state.active -= 1
+        self._active -= 1
+        self._dispatch()
+
+    @asynccontextmanager
+    async def turn(
+        self, tenant: str, priority: str = "interactive"
+    ) -> AsyncIterator[TurnTicket]:
+        state = self._tenant(tenant)
+        bucket = state.bucket
+        if bucket is not None and bucket.available() <= 0:
+            state.rejected += 1
+            raise QuotaExceeded(
+                tenant, "is over its token quota", bucket.seconds_until_positive()
+            )
+        max_queued = state.config.max_queued
+        if max_queued is not None and state.queued() >= max_queued:
+            state.rejected += 1
+            raise QuotaExceeded(tenant, "has too many queued turns")
+        reserved = 0.0
+        if bucket is not None:
+            reserved = state.estimate_tokens()
+            bucket.reserve(reserved)
+
+        # Clients pick the priority, but never above their tenant's class.
+        level = max(PRIORITIES[priority], PRIORITIES[state.config.max_priority])
+        queued_at = time.monotonic()
+        waiter = _Waiter(asyncio.get_running_loop().create_future(), next(self._seq))
+        state.queues[level].append(waiter)
+        self._dispatch()
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # Granted just as we were cancelled: give the slot back.
+                self._release(state)
+            else:
+                state.queues[level].remove(waiter)
+            if bucket is not None:
+                bucket.settle(reserved, 0)
+            raise
+
+        started = time.monotonic()
+        state.wait_times.append(started - queued_at)
+        ticket = TurnTicket()
+        try:
+            yield ticket
+        finally:
+            state.turn_times.append(time.monotonic() - started)
+            state.turns += 1
+            state.tokens += ticket.tokens
+            state.turn_tokens.append(ticket.tokens)
+            if bucket is not None:
+                bucket.settle(reserved, ticket.tokens)
+            self._release(state)
+
+    def metrics(self) -> Dict[str, Dict[str, Optional[float]]]:
+        out = {}
+        for name, state in self._tenants.items():
+            out[name] = {
+                "turns": state.turns,
+                "active": state.active,
+                "queued": state.queued(),
+                "rejected": state.rejected,
+                "tokens": state.tokens,
+                "tokens_available": (
+                    state.bucket.available() if state.bucket is not None else None
+                ),
+                "wait_p50": _quantile(state.wait_times, 0.50),
+                "wait_p99": _quantile(state.wait_times, 0.99),
+                "turn_p50": _quantile(state.turn_times, 0.50),
+                "turn_p95": _quantile(state.turn_times, 0.95),
+                "turn_p99": _quantile(state.turn_times, 0.99),
+            }
+        return out
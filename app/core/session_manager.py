@@ -1,5 +1,5 @@
 import uuid
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 from langchain_core.runnables import Runnable
 
@@ -10,26 +10,42 @@ class SessionManager:
     def __init__(self):
         self._sessions: Dict[str, AgentSession] = {}
 
-    def create_session(self, agent_runnable: Runnable, agent_type: str) -> str:
+    def create_session(
+        self, agent_runnable: Runnable, agent_type: str, tenant: str = "default"
+    ) -> str:
         agent_id = str(uuid.uuid4())
         if agent_type == "deepagent":
             session = DeepAgentSession(
-                session_id=agent_id, agent_runnable=agent_runnable
+                session_id=agent_id, agent_runnable=agent_runnable, tenant=tenant
             )
         else:
-            session = AgentSession(session_id=agent_id, agent_runnable=agent_runnable)
+            session = AgentSession(
+                session_id=agent_id, agent_runnable=agent_runnable, tenant=tenant
+            )
         self._sessions[agent_id] = session
         return agent_id
 
-    def get_session(self, agent_id: str) -> AgentSession | None:
-        return self._sessions.get(agent_id)
-
-    def list_sessions(self) -> List[str]:
-        return list(self._sessions.keys())
-
-    def delete_session(self, agent_id: str) -> bool:
-        if agent_id in self._sessions:
+    def get_session(
+        self, agent_id: str, tenant: Optional[str] = None
+    ) -> AgentSession | None:
+        """Look up a session, hiding other tenants' sessions when `tenant` is set."""
+        session = self._sessions.get(agent_id)
+        if session is None or (tenant is not None and session.tenant != tenant):
+            return None
+        return session
+
+    def list_sessions(self, tenant: Optional[str] = None) -> List[str]:
+        return [
+            agent_id
+            for agent_id, session in self._sessions.items()
+            if tenant is None or session.tenant == tenant
+        ]
+
+    def delete_session(self, agent_id: str, tenant: Optional[str] = None) -> bool:
+        session = self.get_session(agent_id, tenant)
+        if session is not None:
             del self._sessions[agent_id]
+            session.close()
             return True
         return False
 
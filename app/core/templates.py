@@ -0,0 +1,127 @@
+import importlib
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from langchain_core.runnables import Runnable
+
+from app.core.agent_factory import agent_factory
+from app.server.config import Settings
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_DIR = Path("src") / "agents"
+
+
+@dataclass
+class TemplateInfo:
+    name: str
+    # Manifest entry, "./src/agents/<name>.py:<graph factory>".
+    path: str
+    status: str = "pending"  # "pending", "ready" or "failed"
+    agent_type: Optional[str] = None
+    compile_seconds: Optional[float] = None
+    error: Optional[str] = None
+    # Graph built at startup, shared by every session of the template.
+    runnable: Optional[Runnable] = None
+
+
+class TemplateRegistry:
+    """
+    Agent templates declared in the LangGraph manifest (langgraph.json).
+
+    `warm` validates every template and builds its graph once, in a thread
+    pool, so imports and graph construction are paid at boot. `build` then
+    hands that graph to every new session; sessions keep their state in
+    their own input or checkpointer thread, so one compiled graph serves
+    them all. Templates that fail are rejected by `check`; templates not
+    yet warmed, or requested with other settings, are built by the factory.
+    """
+
+    def __init__(
+        self,
+        templates: Dict[str, TemplateInfo],
+        root: Path = Path("."),
+        factory: Callable = agent_factory,
+    ):
+        self.templates = templates
+        self.root = root
+        self.factory = factory
+        self._settings: Optional[Settings] = None
+
+    @classmethod
+    def from_manifest(cls, path: str) -> "TemplateRegistry":
+        manifest = json.loads(Path(path).read_text(encoding="utf-8"))
+        templates = {
+            name: TemplateInfo(name=name, path=entry)
+            for name, entry in manifest.get("graphs", {}).items()
+        }
+        return cls(templates, Path(path).parent)
+
+    def _validate(self, info: TemplateInfo) -> None:
+        file, _, attr = info.path.partition(":")
+        expected = TEMPLATE_DIR / f"{info.name}.py"
+        # agent_factory resolves templates by module name, so the manifest
+        # key has to match the file under src/agents.
+        if Path(file) != expected:
+            raise ValueError(f"graph path must be ./{expected.as_posix()}:<attr>")
+        if not (self.root / file).is_file():
+            raise ValueError(f"{file} does not exist")
+        module = importlib.import_module(f"src.agents.{info.name}")
+        for required in ("create_agent_runnable", attr):
+            if not required or not hasattr(module, required):
+                raise ValueError(f"{file} has no attribute '{required}'")
+
+    def _compile(self, info: TemplateInfo, settings: Settings) -> TemplateInfo:
+        started = time.perf_counter()
+        try:
+            self._validate(info)
+            info.runnable, info.agent_type = self.factory(info.name, settings)
+        except Exception as e:
+            info.status, info.error = "failed", f"{type(e).__name__}: {e}"
+        else:
+            info.status = "ready"
+        info.compile_seconds = time.perf_counter() - started
+        return info
+
+    def warm(self, settings: Settings, max_workers: Optional[int] = None) -> None:
+        # Threads rather than processes: the point is to warm this process's
+        # import and build caches, which a worker process could not hand back.
+        workers = max_workers or max(1, len(self.templates))
+        with ThreadPoolExecutor(workers, thread_name_prefix="template") as pool:
+            results = pool.map(
+                lambda info: self._compile(info, settings),
+                list(self.templates.values()),
+            )
+            for info in results:
+                if info.status == "ready":
+                    logger.info(
+                        "Template %s ready in %.0f ms",
+                        info.name,
+                        info.compile_seconds * 1000,
+                    )
+                else:
+                    logger.error("Template %s failed: %s", info.name, info.error)
+        self._settings = settings
+
+    def check(self, name: str) -> None:
+        info = self.templates.get(name)
+        if info is None:
+            raise ValueError(f"Unknown agent template: {name}")
+        if info.status == "failed":
+            raise ValueError(f"Agent template {name} is unavailable: {info.error}")
+
+    def build(self, name: str, settings: Settings) -> Tuple[Runnable, str]:
+        """Agent factory that reuses the graph built by `warm`."""
+        info = self.templates.get(name)
+        warmed = info is not None and info.runnable is not None
+        if warmed and settings is self._settings:
+            return info.runnable, info.agent_type
+        return self.factory(name, settings)
+
+    def ready(self) -> List[TemplateInfo]:
+        return [info for info in self.templates.values() if info.status == "ready"]
@@ -1,15 +1,33 @@
 # main.py
 import uuid
+from contextlib import asynccontextmanager
 from typing import Dict
 
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
 
 from app.api.v1.agents import router as agents_router
+from app.server.dependencies import (
+    get_settings,
+    get_template_registry,
+    get_traffic_recorder,
+)
 
 # from src.session import AgentSession
 
-app = FastAPI(title="Self-hosted Stateful Agents")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Validate and build every template before serving, so the first create
+    # request per template does not pay for imports and graph construction.
+    get_template_registry().warm(get_settings())
+    yield
+    recorder = get_traffic_recorder()
+    if recorder is not None:
+        recorder.close()
+
+
+app = FastAPI(title="Self-hosted Stateful Agents", lifespan=lifespan)
 app.include_router(agents_router, prefix="/api/v1")
 
 # In-memory registry: {agent_id: AgentSession}
@@ -1,3 +1,5 @@
+from typing import Dict, Literal, Optional
+
 from pydantic import BaseModel
 
 
@@ -11,12 +13,54 @@ class CreateAgentResponse(BaseModel):
 
 class ChatRequest(BaseModel):
     message: str
+    # Interactive turns are scheduled ahead of batch turns under contention.
+    priority: Literal["interactive", "batch"] = "interactive"
 
 
 class ChatResponse(BaseModel):
     reply: str
     agent_id: str
+    # Collapsed-stack profile of the turn, only set for `?profile=true`.
+    profile: Optional[str] = None
 
 
 class ListAgentsResponse(BaseModel):
     agents: list[str]
+
+
+class ToolOutputStats(BaseModel):
+    agent_id: str
+    # Tool results truncated in the history and stored out of band.
+    offloaded: int
+    bytes_saved: int
+    # Estimated prompt tokens not sent to the model because of truncation.
+    prompt_tokens_saved: int
+
+
+class TemplateSummary(BaseModel):
+    name: str
+    agent_type: str
+    # Time to validate and build the template's graph at startup.
+    compile_seconds: float
+
+
+class ListTemplatesResponse(BaseModel):
+    templates: list[TemplateSummary]
+
+
+class TenantMetrics(BaseModel):
+    turns: int
+    active: int
+    queued: int
+    rejected: int
+    tokens: int
+    tokens_available: Optional[float] = None
+    wait_p50: Optional[float] = None
+    wait_p99: Optional[float] = None
+    turn_p50: Optional[float] = None
+    turn_p95: Optional[float] = None
+    turn_p99: Optional[float] = None
+
+
+class TenantMetricsResponse(BaseModel):
+    tenants: Dict[str, TenantMetrics]
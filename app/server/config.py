@@ -1,8 +1,23 @@
-from typing import Optional
+import importlib.util
+from typing import Dict, Literal, Optional
 
+from pydantic import BaseModel, Field, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
+class TenantConfig(BaseModel):
+    # Requests carrying this key in X-API-Key belong to the tenant.
+    api_key: Optional[str] = None
+    # Share of contended turn slots relative to other tenants.
+    weight: float = Field(default=1.0, gt=0)
+    max_concurrency: Optional[int] = Field(default=None, ge=1)
+    max_queued: Optional[int] = Field(default=None, ge=0)
+    tokens_per_minute: Optional[int] = Field(default=None, gt=0)
+    # Highest priority class the tenant may use; "batch" runs every turn of
+    # the tenant as batch whatever the request asks for.
+    max_priority: Literal["interactive", "batch"] = "interactive"
+
+
 class Settings(BaseSettings):
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
@@ -13,3 +28,50 @@ class Settings(BaseSettings):
 
     GOOGLE_API_KEY: str
     LANGSMITH_API_KEY: Optional[str] = None
+
+    # LangGraph manifest listing the agent templates built at startup.
+    TEMPLATE_MANIFEST: str = "langgraph.json"
+
+    # Model calls
+    LLM_HEDGING: bool = False
+
+    # Checkpoint serialization: "jsonplus" (LangGraph default), "msgpack" or
+    # "orjson". Payloads at or above the threshold (bytes) are zstd-compressed.
+    CHECKPOINT_SERDE: Literal["jsonplus", "msgpack", "orjson"] = "jsonplus"
+    CHECKPOINT_COMPRESS_THRESHOLD: Optional[int] = Field(default=None, ge=0)
+
+    # Store deep-agent file contents in a content-addressed blob store under
+    # this directory, keeping only digests in graph state.
+    DEEPAGENT_BLOB_DIR: Optional[str] = None
+
+    # Tool results longer than this many characters are truncated in the
+    # message history; the full text goes to a blob store under
+    # TOOL_OUTPUT_DIR and the model can read it back by handle.
+    TOOL_OUTPUT_MAX_CHARS: Optional[int] = Field(default=None, gt=0)
+    TOOL_OUTPUT_DIR: str = ".tool_outputs"
+
+    # Collapsed-stack files from `?profile=true` chat turns are also written
+    # here when set.
+    PROFILE_DIR: Optional[str] = None
+
+    # Tenants as JSON, e.g. {"acme": {"api_key": "...", "weight": 2,
+    # "max_concurrency": 4, "tokens_per_minute": 200000}}. Requests without a
+    # matching key run as the "default" tenant, which has no limits unless a
+    # "default" entry is configured.
+    TENANTS: Dict[str, TenantConfig] = {}
+    # Turns running at once across all tenants; unset means no global cap.
+    MAX_CONCURRENT_TURNS: Optional[int] = Field(default=None, ge=1)
+
+    # Append create/delete/chat traffic, including model responses, to this
+    # JSONL file for offline replay (benchmarks/replay.py).
+    CAPTURE_PATH: Optional[str] = None
+
+    @field_validator("CHECKPOINT_COMPRESS_THRESHOLD")
+    @classmethod
+    def _zstd_installed(cls, threshold: Optional[int]) -> Optional[int]:
+        if threshold is not None and importlib.util.find_spec("zstandard") is None:
+            raise ValueError(
+                "checkpoint compression requires the 'zstandard' package "
+                "(install the zstd extra)"
+            )
+        return threshold
@@ -1,7 +1,13 @@
+import secrets
 from functools import lru_cache
+from typing import Optional
 
-from app.core.agent_factory import agent_factory
+from fastapi import Depends, Header
+
+from app.core.capture import TrafficRecorder
+from app.core.scheduler import DEFAULT_TENANT, TurnScheduler
 from app.core.session_manager import SessionManager, session_manager
+from app.core.templates import TemplateRegistry
 from app.server.config import Settings
 
 
@@ -11,8 +17,47 @@ def get_settings() -> Settings:
 
 
 def get_agent_factory():
-    return agent_factory
+    # Reuses graphs prebuilt at startup; falls back to agent_factory.
+    return get_template_registry().build
+
+
+@lru_cache(maxsize=None)
+def get_template_registry() -> TemplateRegistry:
+    return TemplateRegistry.from_manifest(get_settings().TEMPLATE_MANIFEST)
 
 
 def get_session_manager() -> SessionManager:
     return session_manager
+
+
+@lru_cache(maxsize=None)
+def get_turn_scheduler() -> TurnScheduler:
+    return TurnScheduler.from_settings(get_settings())
+
+
+@lru_cache(maxsize=None)
+def get_traffic_recorder() -> Optional[TrafficRecorder]:
+    path = get_settings().CAPTURE_PATH
+    return TrafficRecorder(path) if path else None
+
+
+def get_tenant(
+    x_api_key: Optional[str] = Header(default=None),
+    settings: Settings = Depends(get_settings),
+) -> str:
+    """Resolve the tenant from X-API-Key, falling back to the default tenant."""
+    if x_api_key is not None:
+        for name, tenant in settings.TENANTS.items():
+            if tenant.api_key and secrets.compare_digest(x_api_key, tenant.api_key):
+                return name
+    return DEFAULT_TENANT
+
+
+def is_admin(
+    x_api_key: Optional[str] = Header(default=None),
+    settings: Settings = Depends(get_settings),
+) -> bool:
+    """True when the request carries `APP_API_KEY` in the X-API-Key header."""
+    if settings.APP_API_KEY is None or x_api_key is None:
+        return False
+    return secrets.compare_digest(x_api_key, settings.APP_API_KEY)
@@ -0,0 +1,21 @@
+from typing import Any
+
+import ormsgpack
+from fastapi import Request, Response
+from pydantic import BaseModel
+
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+
+
+class MsgpackResponse(Response):
+    media_type = MSGPACK_MEDIA_TYPE
+
+    def render(self, content: Any) -> bytes:
+        return ormsgpack.packb(content)
+
+
+def negotiate(request: Request, payload: BaseModel) -> BaseModel | Response:
+    """Return `payload` as msgpack if the client asks for it, else as JSON."""
+    if MSGPACK_MEDIA_TYPE in request.headers.get("accept", ""):
+        return MsgpackResponse(payload.model_dump(exclude_none=True))
+    return payload
@@ -0,0 +1,75 @@
+# benchmarks/file_backend.py
+"""
+Checkpoint bytes and turn time as an agent keeps writing large files.
+
+    python -m benchmarks.file_backend --files 100 --file-kib 256
+"""
+import argparse
+import asyncio
+import tempfile
+import time
+
+from deepagents.backends import StateBackend
+from deepagents.middleware.filesystem import FilesystemState
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import END, START, StateGraph
+
+from src.backends import BlobStateBackend, BlobStore
+
+
+def build_graph(backend, checkpointer, file_bytes: int):
+    def write_file(state: FilesystemState):
+        index = len(state.get("files") or {})
+        body = f"{index}\n" + "scratch line\n" * (file_bytes // 13)
+        backend.write(f"/scratch/{index}.txt", body)
+        return {}
+
+    graph = StateGraph(FilesystemState)
+    graph.add_node("write_file", write_file)
+    graph.add_edge(START, "write_file")
+    graph.add_edge("write_file", END)
+    return graph.compile(checkpointer=checkpointer)
+
+
+def stored_bytes(checkpointer: MemorySaver) -> int:
+    """Serialized bytes the checkpointer currently holds."""
+    total = sum(len(data) for _, data in checkpointer.blobs.values())
+    for thread in checkpointer.storage.values():
+        for checkpoints in thread.values():
+            total += sum(len(c[0][1]) + len(c[1][1]) for c in checkpoints.values())
+    for writes in checkpointer.writes.values():
+        total += sum(len(w[2][1]) for w in writes.values())
+    return total
+
+
+async def run(name: str, backend, files: int, file_bytes: int) -> None:
+    checkpointer = MemorySaver()
+    graph = build_graph(backend, checkpointer, file_bytes)
+    config = {"configurable": {"thread_id": name}}
+    previous = 0
+    for turn in range(1, files + 1):
+        started = time.perf_counter()
+        await graph.ainvoke({"messages": []}, config=config)
+        elapsed = time.perf_counter() - started
+        total = stored_bytes(checkpointer)
+        if turn in (1, files // 2, files):
+            print(
+                f"  {name:<6} files={turn:<4} turn={elapsed * 1000:7.1f}ms "
+                f"written={(total - previous) / 1024:9.1f}KiB "
+                f"total={total / 1024 / 1024:8.2f}MiB"
+            )
+        previous = total
+
+
+async def main(args) -> None:
+    file_bytes = args.file_kib * 1024
+    with tempfile.TemporaryDirectory() as root:
+        await run("state", StateBackend(), args.files, file_bytes)
+        await run("blob", BlobStateBackend(BlobStore(root)), args.files, file_bytes)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=100)
+    parser.add_argument("--file-kib", type=int, default=256)
+    asyncio.run(main(parser.parse_args()))
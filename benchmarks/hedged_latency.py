@@ -0,0 +1,77 @@
+# benchmarks/hedged_latency.py
+"""
+Compare model-call latency with and without hedging, fully offline.
+
+    python -m benchmarks.hedged_latency --requests 2000 --tail-p 0.03
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from langchain_core.messages import HumanMessage
+
+from src.fake_models import LatencyFakeChatModel, lognormal_latency
+from src.llm import HedgedChatModel, LatencyTracker, RetryBudget
+
+
+def percentile(samples: list[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def drive(model, requests: int, concurrency: int) -> list[float]:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+
+    async def one():
+        async with semaphore:
+            started = time.perf_counter()
+            await model.ainvoke([HumanMessage(content="ping")])
+            latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return latencies
+
+
+def report(name: str, latencies: list[float]) -> None:
+    print(
+        f"{name:<10} p50={percentile(latencies, 0.50) * 1000:7.1f}ms "
+        f"p95={percentile(latencies, 0.95) * 1000:7.1f}ms "
+        f"p99={percentile(latencies, 0.99) * 1000:7.1f}ms "
+        f"mean={statistics.mean(latencies) * 1000:7.1f}ms"
+    )
+
+
+async def main(args) -> None:
+    sampler = lognormal_latency(
+        median=args.median, sigma=args.sigma, tail_p=args.tail_p, tail=args.tail
+    )
+
+    baseline = LatencyFakeChatModel(latency=sampler)
+    report("baseline", await drive(baseline, args.requests, args.concurrency))
+
+    inner = LatencyFakeChatModel(latency=sampler)
+    hedged = HedgedChatModel(
+        inner=inner,
+        tracker=LatencyTracker(percentile=args.percentile),
+        budget=RetryBudget(ratio=args.budget_ratio),
+    )
+    report("hedged", await drive(hedged, args.requests, args.concurrency))
+    print(
+        f"hedged stats: {hedged.stats} "
+        f"(extra load {inner.calls / args.requests - 1:.1%})"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--median", type=float, default=0.02)
+    parser.add_argument("--sigma", type=float, default=0.4)
+    parser.add_argument("--tail-p", type=float, default=0.03)
+    parser.add_argument("--tail", type=float, default=0.5)
+    parser.add_argument("--percentile", type=float, default=0.95)
+    parser.add_argument("--budget-ratio", type=float, default=0.1)
+    asyncio.run(main(parser.parse_args()))
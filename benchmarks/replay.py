@@ -0,0 +1,235 @@
+# benchmarks/replay.py
+"""
+Re-drive a captured traffic trace (CAPTURE_PATH) against the app, offline.
+
+Model calls are served from the recorded responses, so only server-side
+behaviour is measured. Server settings (serde, backends, tenants...) are
+taken from the environment as usual. Each recorded tenant gets a replay
+API key, so requests are scheduled and rate-limited as that tenant; its
+weight and quotas come from TENANTS when it is configured there.
+
+    python -m benchmarks.replay trace.jsonl --speed 4
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+os.environ.setdefault("GOOGLE_API_KEY", "replay")
+
+import httpx  # noqa: E402
+
+from app.core.agent_factory import agent_factory  # noqa: E402
+from app.core.scheduler import DEFAULT_TENANT, TurnScheduler  # noqa: E402
+from app.main import app  # noqa: E402
+from app.server.config import Settings, TenantConfig  # noqa: E402
+from app.server.dependencies import (  # noqa: E402
+    get_agent_factory,
+    get_settings,
+    get_traffic_recorder,
+    get_turn_scheduler,
+)
+from src.fake_models import ReplayChatModel  # noqa: E402
+
+
+def load_trace(path: str) -> List[Dict[str, Any]]:
+    with open(path, encoding="utf-8") as f:
+        events = [json.loads(line) for line in f if line.strip()]
+    return sorted(events, key=lambda e: e["ts"])
+
+
+def percentile(samples: List[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def replay_settings(
+    events: List[Dict[str, Any]], settings: Settings
+) -> Tuple[Settings, Dict[str, str]]:
+    """Settings with a replay API key for every tenant in the trace."""
+    tenants = dict(settings.TENANTS)
+    keys: Dict[str, str] = {}
+    for event in events:
+        tenant = event.get("tenant", DEFAULT_TENANT)
+        if tenant == DEFAULT_TENANT or tenant in keys:
+            continue
+        keys[tenant] = f"replay-{tenant}"
+        config = tenants.get(tenant) or TenantConfig()
+        tenants[tenant] = config.model_copy(update={"api_key": keys[tenant]})
+    return settings.model_copy(update={"TENANTS": tenants}), keys
+
+
+async def replay(
+    events: List[Dict[str, Any]],
+    speed: float = 1.0,
+    model_latency: bool = True,
+    settings: Optional[Settings] = None,
+) -> Dict[str, Any]:
+    # Every recorded agent gets one fake model that serves all of its
+    # recorded model calls, across turns, in order.
+    calls: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for event in events:
+        if event["event"] == "chat":
+            calls[event["agent_id"]].extend(event.get("model_calls", []))
+    models: Dict[str, ReplayChatModel] = {}
+
+    creating: Dict[str, str] = {}
+    create_lock = asyncio.Lock()
+
+    def replay_factory(agent_template, settings):
+        recorded_id = creating["current"]
+        model = ReplayChatModel(
+            calls=calls.get(recorded_id, []), replay_latency=model_latency
+        )
+        models[recorded_id] = model
+        return agent_factory(agent_template, settings, model=model)
+
+    settings, keys = replay_settings(events, settings or get_settings())
+    scheduler = TurnScheduler.from_settings(settings)
+    overrides = {
+        get_agent_factory: lambda: replay_factory,
+        get_traffic_recorder: lambda: None,
+        get_settings: lambda: settings,
+        get_turn_scheduler: lambda: scheduler,
+    }
+    app.dependency_overrides.update(overrides)
+
+    def headers(event) -> Dict[str, str]:
+        key = keys.get(event.get("tenant", DEFAULT_TENANT))
+        return {"X-API-Key": key} if key else {}
+
+    ids: Dict[str, asyncio.Future] = defaultdict(
+        lambda: asyncio.get_running_loop().create_future()
+    )
+    # Turns of one agent are chained so they reach the model in trace order.
+    previous_turn: Dict[str, asyncio.Future] = {}
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    statuses: Counter = Counter()
+    skipped = 0
+
+    try:
+        transport = httpx.ASGITransport(app=app)
+        client = httpx.AsyncClient(transport=transport, base_url="http://replay")
+        async with client:
+
+            async def create(event):
+                async with create_lock:
+                    creating["current"] = event["agent_id"]
+                    started = time.perf_counter()
+                    response = await client.post(
+                        "/api/v1/agents",
+                        json={"agent_template": event["agent_template"]},
+                        headers=headers(event),
+                    )
+                latencies["create_agent"].append(time.perf_counter() - started)
+                statuses[("create_agent", response.status_code)] += 1
+                ids[event["agent_id"]].set_result(response.json().get("agent_id"))
+
+            async def chat(event, after):
+                if after is not None:
+                    await after
+                agent_id = await ids[event["agent_id"]]
+                started = time.perf_counter()
+                response = await client.post(
+                    f"/api/v1/agents/{agent_id}/chat",
+                    json={
+                        "message": event["message"],
+                        "priority": event["priority"],
+                    },
+                    headers=headers(event),
+                )
+                latencies["chat"].append(time.perf_counter() - started)
+                statuses[("chat", response.status_code)] += 1
+
+            async def delete(event, after):
+                if after is not None:
+                    await after
+                agent_id = await ids[event["agent_id"]]
+                started = time.perf_counter()
+                response = await client.delete(
+                    f"/api/v1/agents/{agent_id}", headers=headers(event)
+                )
+                latencies["delete_agent"].append(time.perf_counter() - started)
+                statuses[("delete_agent", response.status_code)] += 1
+
+            async def at(offset, coro):
+                await asyncio.sleep(max(0.0, offset - (time.perf_counter() - t0)))
+                await coro
+
+            created = {
+                e["agent_id"] for e in events if e["event"] == "create_agent"
+            }
+            tasks = []
+            t0 = time.perf_counter()
+            first_ts = events[0]["ts"] if events else 0.0
+            for event in events:
+                offset = (event["ts"] - first_ts) / speed
+                if event["event"] == "create_agent":
+                    coro = create(event)
+                elif event["agent_id"] not in created:
+                    # Session was created before capture started.
+                    skipped += 1
+                    continue
+                elif event["event"] == "chat":
+                    coro = chat(event, previous_turn.get(event["agent_id"]))
+                else:
+                    coro = delete(event, previous_turn.get(event["agent_id"]))
+                task = asyncio.ensure_future(at(offset, coro))
+                if event["event"] != "create_agent":
+                    previous_turn[event["agent_id"]] = task
+                tasks.append(task)
+            await asyncio.gather(*tasks)
+            wall = time.perf_counter() - t0
+    finally:
+        for dependency in overrides:
+            app.dependency_overrides.pop(dependency, None)
+    return {
+        "wall": wall,
+        "latencies": dict(latencies),
+        "statuses": dict(statuses),
+        "skipped": skipped,
+        "misses": sum(m.misses for m in models.values()),
+        "tenants": scheduler.metrics(),
+    }
+
+
+def report(result: Dict[str, Any]) -> None:
+    print(f"wall={result['wall']:.2f}s skipped={result['skipped']}")
+    for route, samples in result["latencies"].items():
+        print(
+            f"  {route:<13} n={len(samples):<5} "
+            f"rate={len(samples) / result['wall']:7.1f}/s "
+            f"p50={percentile(samples, 0.50) * 1000:7.1f}ms "
+            f"p95={percentile(samples, 0.95) * 1000:7.1f}ms "
+            f"p99={percentile(samples, 0.99) * 1000:7.1f}ms "
+            f"mean={statistics.mean(samples) * 1000:7.1f}ms"
+        )
+    print(f"statuses={result['statuses']}")
+    for tenant, metrics in result["tenants"].items():
+        wait_p99 = metrics["wait_p99"] or 0.0
+        print(
+            f"  tenant {tenant:<12} turns={metrics['turns']:<5} "
+            f"rejected={metrics['rejected']:<5} wait_p99={wait_p99 * 1000:7.1f}ms"
+        )
+    if result["misses"]:
+        print(f"WARNING: {result['misses']} model calls beyond the recording")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("trace")
+    parser.add_argument("--speed", type=float, default=1.0)
+    parser.add_argument(
+        "--no-model-latency",
+        action="store_true",
+        help="Serve recorded responses immediately instead of at recorded latency",
+    )
+    args = parser.parse_args()
+    result = asyncio.run(
+        replay(load_trace(args.trace), args.speed, not args.no_model_latency)
+    )
+    report(result)
@@ -0,0 +1,69 @@
+# benchmarks/serde.py
+"""
+Serde micro-benchmark for checkpoint-sized message states.
+
+    python -m benchmarks.serde --sizes 1000 10000
+"""
+import argparse
+import time
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from src.serde import Serializer
+
+
+def build_state(n: int) -> dict:
+    messages = []
+    for i in range(n // 3):
+        messages.append(HumanMessage(content=f"question {i} " + "lorem ipsum " * 10))
+        messages.append(
+            AIMessage(
+                content="",
+                tool_calls=[{"name": "get_user_info", "args": {}, "id": f"call-{i}"}],
+            )
+        )
+        messages.append(
+            ToolMessage(content="User is John " * 5, tool_call_id=f"call-{i}")
+        )
+    return {"messages": messages, "user_name": "John"}
+
+
+def timed(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main(args) -> None:
+    configs = [
+        ("jsonplus", None),
+        ("msgpack", None),
+        ("orjson", None),
+        ("jsonplus", args.compress_threshold),
+        ("msgpack", args.compress_threshold),
+        ("orjson", args.compress_threshold),
+    ]
+    for size in args.sizes:
+        state = build_state(size)
+        print(f"\n{len(state['messages'])} messages")
+        for backend, threshold in configs:
+            serde = Serializer(backend=backend, compress_threshold=threshold)
+            payload = serde.dumps_typed(state)
+            dump = timed(lambda: serde.dumps_typed(state), args.repeat)
+            load = timed(lambda: serde.loads_typed(payload), args.repeat)
+            name = backend + ("+zstd" if threshold is not None else "")
+            print(
+                f"  {name:<14} dumps={dump * 1000:8.1f}ms "
+                f"loads={load * 1000:8.1f}ms size={len(payload[1]) / 1024:9.1f}KiB"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--compress-threshold", type=int, default=64 * 1024)
+    main(parser.parse_args())
@@ -0,0 +1,72 @@
+# benchmarks/tool_outputs.py
+"""
+Prompt size per turn when one early tool call returns a large result.
+
+    python -m benchmarks.tool_outputs --turns 20 --result-kib 64 --max-chars 4000
+"""
+import argparse
+import asyncio
+import tempfile
+import time
+from typing import Optional
+
+from langchain.agents import create_agent
+from langchain.tools import tool
+from langchain_core.messages import AIMessage
+
+from src.backends import BlobStore
+from src.fake_models import ScriptedChatModel, tool_call_message
+from src.session import AgentSession
+from src.tool_outputs import ToolOutputOffloader
+
+
+async def run(
+    name: str,
+    turns: int,
+    result_bytes: int,
+    offloader: Optional[ToolOutputOffloader],
+) -> None:
+    @tool
+    def search() -> str:
+        """Search the corpus."""
+        return "match: lorem ipsum dolor sit amet\n" * (result_bytes // 33)
+
+    # Calls `search` on its first call and answers afterwards.
+    model = ScriptedChatModel(
+        script=[tool_call_message("search"), AIMessage(content="answer")]
+    )
+    agent = create_agent(
+        model=model,
+        tools=[search],
+        middleware=[offloader] if offloader else [],
+    )
+    session = AgentSession(name, agent)
+    started = time.perf_counter()
+    for turn in range(turns):
+        await session.chat(f"question {turn}")
+    elapsed = time.perf_counter() - started
+    prompt_chars = model.prompt_chars()
+    total = sum(prompt_chars)
+    print(
+        f"  {name:<8} calls={len(prompt_chars):<4} "
+        f"last_prompt={prompt_chars[-1] / 1024:8.1f}KiB "
+        f"total_prompt={total / 1024:9.1f}KiB "
+        f"~tokens={total // 4:<9} time={elapsed * 1000:7.1f}ms"
+    )
+    print(f"           stats={session.tool_output_stats()}")
+
+
+async def main(args) -> None:
+    result_bytes = args.result_kib * 1024
+    await run("inline", args.turns, result_bytes, None)
+    with tempfile.TemporaryDirectory() as root:
+        offloader = ToolOutputOffloader(BlobStore(root), args.max_chars)
+        await run("offload", args.turns, result_bytes, offloader)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--turns", type=int, default=20)
+    parser.add_argument("--result-kib", type=int, default=64)
+    parser.add_argument("--max-chars", type=int, default=4000)
+    asyncio.run(main(parser.parse_args()))
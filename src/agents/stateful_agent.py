@@ -2,17 +2,21 @@
 import asyncio
 import os
 from pprint import pprint
-from typing import Tuple
+from typing import Optional, Tuple
 
 from dotenv import load_dotenv
 from langchain.agents import AgentState, create_agent
 from langchain.messages import HumanMessage, ToolMessage
 from langchain.tools import ToolRuntime, tool
+from langchain_core.language_models import BaseChatModel
 from langchain_core.messages import AIMessage, ToolMessage
 from langchain_core.runnables import Runnable
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langgraph.types import Command
 
+from src.llm import HedgedChatModel
+from src.tool_outputs import ToolOutputOffloader
+
 
 class CustomState(AgentState):
     user_name: str | None = None
@@ -81,23 +85,41 @@ You are an assistant which can look up user info and their diagnosis.
 """
 
 
-def create_agent_runnable(google_api_key: str) -> Tuple[Runnable, str]:
-    model = ChatGoogleGenerativeAI(
-        model="gemini-2.5-flash",
-        temperature=0,
-        thinking_budget=0,
-        convert_system_message_to_human=True,
-        google_api_key=google_api_key,
-    )
+def create_agent_runnable(
+    google_api_key: str,
+    hedged: bool = False,
+    model: Optional[BaseChatModel] = None,
+    tool_output_offloader: Optional[ToolOutputOffloader] = None,
+) -> Tuple[Runnable, str]:
+    # `model` lets tests and replays swap in an offline model.
+    if model is None:
+        model = ChatGoogleGenerativeAI(
+            model="gemini-2.5-flash",
+            temperature=0,
+            thinking_budget=0,
+            convert_system_message_to_human=True,
+            google_api_key=google_api_key,
+            # When hedged, HedgedChatModel owns retries; each attempt fails fast.
+            max_retries=1 if hedged else 6,
+        )
+    if hedged:
+        model = HedgedChatModel(inner=model)
     agent_runnable = create_agent(
         model=model,
         system_prompt=system_prompt,
         tools=[update_user_info, diagnose_user, get_user_info],
+        middleware=[tool_output_offloader] if tool_output_offloader else [],
         state_schema=CustomState,
     )
     return agent_runnable, "agent"
 
 
+def make_graph() -> Runnable:
+    """Graph factory referenced by langgraph.json."""
+    agent_runnable, _ = create_agent_runnable(os.getenv("GOOGLE_API_KEY"))
+    return agent_runnable
+
+
 if __name__ == "__main__":
     # Load environment variables from .env file
     load_dotenv()
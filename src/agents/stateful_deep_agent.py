@@ -3,7 +3,7 @@ import asyncio
 import os
 import uuid
 from pprint import pprint
-from typing import Tuple
+from typing import Optional, Tuple
 
 from deepagents import create_deep_agent
 from deepagents.backends import StateBackend
@@ -12,13 +12,19 @@ from langchain.agents import AgentState
 from langchain.agents.middleware import AgentMiddleware
 from langchain.messages import HumanMessage, ToolMessage
 from langchain.tools import ToolRuntime, tool
+from langchain_core.language_models import BaseChatModel
 from langchain_core.messages import AIMessage, ToolMessage
 from langchain_core.runnables import Runnable, RunnableConfig
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langgraph.checkpoint.memory import MemorySaver
+from langgraph.checkpoint.serde.base import SerializerProtocol
 from langgraph.graph.state import CompiledStateGraph
 from langgraph.types import Command
 
+from src.backends import BlobStateBackend, BlobStore
+from src.llm import HedgedChatModel
+from src.tool_outputs import ToolOutputOffloader
+
 
 class CustomState(AgentState):
     user_name: str | None = None
@@ -92,24 +98,49 @@ You are an assistant which can look up user info and their diagnosis.
 """
 
 
-def create_agent_runnable(google_api_key: str) -> Tuple[Runnable, str]:
-    model = ChatGoogleGenerativeAI(
-        model="gemini-2.5-flash",
-        temperature=0,
-        thinking_budget=0,
-        convert_system_message_to_human=True,
-        google_api_key=google_api_key,
-    )
+def create_agent_runnable(
+    google_api_key: str,
+    hedged: bool = False,
+    checkpoint_serde: Optional[SerializerProtocol] = None,
+    blob_store: Optional[BlobStore] = None,
+    model: Optional[BaseChatModel] = None,
+    tool_output_offloader: Optional[ToolOutputOffloader] = None,
+) -> Tuple[Runnable, str]:
+    # `model` lets tests and replays swap in an offline model.
+    if model is None:
+        model = ChatGoogleGenerativeAI(
+            model="gemini-2.5-flash",
+            temperature=0,
+            thinking_budget=0,
+            convert_system_message_to_human=True,
+            google_api_key=google_api_key,
+            # When hedged, HedgedChatModel owns retries; each attempt fails fast.
+            max_retries=1 if hedged else 6,
+        )
+    if hedged:
+        model = HedgedChatModel(inner=model)
+    # Without a blob store, deepagents' default backend is left in place.
+    options = {}
+    if blob_store is not None:
+        options["backend"] = BlobStateBackend(blob_store)
     agent_runnable = create_deep_agent(
         model=model,
         system_prompt=system_prompt,
         tools=[update_user_info, diagnose_user, get_user_info],
-        middleware=[CustomStateMiddleware()],
-        checkpointer=MemorySaver(),
+        middleware=[CustomStateMiddleware()]
+        + ([tool_output_offloader] if tool_output_offloader else []),
+        checkpointer=MemorySaver(serde=checkpoint_serde),
+        **options,
     )
     return agent_runnable, "deepagent"
 
 
+def make_graph() -> Runnable:
+    """Graph factory referenced by langgraph.json."""
+    agent_runnable, _ = create_agent_runnable(os.getenv("GOOGLE_API_KEY"))
+    return agent_runnable
+
+
 if __name__ == "__main__":
     # Load environment variables from .env file
     load_dotenv()
@@ -0,0 +1,182 @@
+# src/backends.py
+import hashlib
+import os
+import tempfile
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Collection, Dict, Iterator, List, Optional
+
+from deepagents.backends import StateBackend
+from deepagents.backends.protocol import (
+    EditResult,
+    FileDownloadResponse,
+    FileInfo,
+    GlobResult,
+    GrepResult,
+    LsResult,
+    ReadResult,
+)
+from deepagents.backends.utils import file_data_to_string
+
+# Key that replaces "content" in state for files whose body lives in a BlobStore.
+BLOB_KEY = "blob"
+# UTF-8 size of the body, kept next to the digest so listings need no reads.
+SIZE_KEY = "size"
+
+ALL_FILES = None
+# Paths whose bodies the running backend call needs (ALL_FILES for every
+# file). Other blob files are read with empty content.
+_loading: ContextVar[Optional[Collection[str]]] = ContextVar(
+    "blob_loading", default=()
+)
+
+
+class BlobStore:
+    """
+    Content-addressed blob store on local disk.
+
+    Blobs are named by their sha256, so identical contents are stored once
+    and a blob never changes after it is written. Decoded text is cached
+    per digest.
+    """
+
+    def __init__(self, root: str | os.PathLike, cache_size: int = 256):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.read_text = lru_cache(maxsize=cache_size)(self._read_text)
+
+    def path(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest
+
+    def put(self, data: bytes) -> str:
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path(digest)
+        if path.exists():
+            return digest
+        path.parent.mkdir(exist_ok=True)
+        # Write then rename so concurrent writers never expose a partial blob.
+        fd, tmp = tempfile.mkstemp(dir=path.parent)
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+        return digest
+
+    def get(self, digest: str) -> bytes:
+        return self.path(digest).read_bytes()
+
+    def size(self, digest: str) -> int:
+        return self.path(digest).stat().st_size
+
+    def _read_text(self, digest: str) -> str:
+        return self.get(digest).decode("utf-8")
+
+
+class BlobStateBackend(StateBackend):
+    """
+    StateBackend that keeps file bodies out of graph state.
+
+    The `files` channel only holds metadata, the blob digest and the body
+    size, so checkpoints stay small no matter how large the files an agent
+    writes. Every state write and read in StateBackend goes through
+    `_send_files_update` / `_read_files`. Bodies are only loaded from the
+    store by the operations that look at them (`read`, `edit`, `grep`,
+    `download_files`); `ls` and `glob` take sizes from state. Blobs are
+    shared across threads and are not deleted with the file; prune the
+    store directory out of band if needed.
+    """
+
+    def __init__(self, store: BlobStore):
+        super().__init__()
+        self.store = store
+
+    @contextmanager
+    def _load(self, paths: Optional[Collection[str]]) -> Iterator[None]:
+        token = _loading.set(paths)
+        try:
+            yield
+        finally:
+            _loading.reset(token)
+
+    def _to_ref(self, file_data: Dict[str, Any]) -> Dict[str, Any]:
+        data = file_data_to_string(file_data).encode("utf-8")
+        ref = {k: v for k, v in file_data.items() if k != "content"}
+        ref[BLOB_KEY] = self.store.put(data)
+        ref[SIZE_KEY] = len(data)
+        return ref
+
+    def _hydrate(self, ref: Dict[str, Any], load: bool) -> Dict[str, Any]:
+        if BLOB_KEY not in ref:
+            # Files written inline (e.g. passed on invoke) are left as-is.
+            return ref
+        file_data = {k: v for k, v in ref.items() if k not in (BLOB_KEY, SIZE_KEY)}
+        file_data["content"] = self.store.read_text(ref[BLOB_KEY]) if load else ""
+        return file_data
+
+    def _size(self, ref: Dict[str, Any]) -> int:
+        if SIZE_KEY in ref:
+            return ref[SIZE_KEY]
+        # Refs written before sizes were recorded.
+        return self.store.size(ref[BLOB_KEY])
+
+    def _with_sizes(self, infos: Optional[List[FileInfo]]) -> None:
+        refs = super()._read_files()
+        for info in infos or []:
+            ref = refs.get(info["path"])
+            if ref is not None and BLOB_KEY in ref:
+                info["size"] = self._size(ref)
+
+    def _read_files(self) -> Dict[str, Any]:
+        paths = _loading.get()
+        return {
+            path: self._hydrate(ref, paths is ALL_FILES or path in paths)
+            for path, ref in super()._read_files().items()
+        }
+
+    def _send_files_update(self, update: Dict[str, Any]) -> None:
+        super()._send_files_update(
+            {
+                path: None if file_data is None else self._to_ref(file_data)
+                for path, file_data in update.items()
+            }
+        )
+
+    def read(self, file_path: str, offset: int = 0, limit: int = 2000) -> ReadResult:
+        with self._load({file_path}):
+            return super().read(file_path, offset, limit)
+
+    def edit(
+        self,
+        file_path: str,
+        old_string: str,
+        new_string: str,
+        replace_all: bool = False,
+    ) -> EditResult:
+        with self._load({file_path}):
+            return super().edit(file_path, old_string, new_string, replace_all)
+
+    def grep(
+        self,
+        pattern: str,
+        path: Optional[str] = None,
+        glob: Optional[str] = None,
+        *,
+        max_count: Optional[int] = None,
+    ) -> GrepResult:
+        with self._load(ALL_FILES):
+            return super().grep(pattern, path, glob, max_count=max_count)
+
+    def download_files(self, paths: List[str]) -> List[FileDownloadResponse]:
+        with self._load(set(paths)):
+            return super().download_files(paths)
+
+    def ls(self, path: str) -> LsResult:
+        result = super().ls(path)
+        self._with_sizes(result.entries)
+        return result
+
+    def glob(self, pattern: str, path: Optional[str] = None) -> GlobResult:
+        result = super().glob(pattern, path)
+        self._with_sizes(result.matches)
+        return result
@@ -0,0 +1,182 @@
+# src/fake_models.py
+import asyncio
+import random
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, messages_from_dict
+from langchain_core.outputs import ChatGeneration, ChatResult
+from pydantic import Field
+
+
+def lognormal_latency(
+    median: float = 0.05, sigma: float = 0.5, tail_p: float = 0.0, tail: float = 1.0
+) -> Callable[[], float]:
+    """
+    Latency sampler: lognormal body plus an optional slow tail.
+
+    With probability `tail_p` a call takes `tail` seconds, mimicking a stuck
+    or overloaded provider replica.
+    """
+
+    def sample() -> float:
+        if random.random() < tail_p:
+            return tail
+        return random.lognormvariate(0, sigma) * median
+
+    return sample
+
+
+class LatencyFakeChatModel(BaseChatModel):
+    """
+    Offline chat model with injected latency and failures.
+
+    Used by tests and benchmarks in place of Gemini. The reply is also
+    reported as a single streamed token, like a streaming provider would.
+    """
+
+    reply: str = "ok"
+    latency: Callable[[], float] = lambda: 0.0
+    error_rate: float = 0.0
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "latency-fake"
+
+    def bind_tools(self, tools: Any, **kwargs: Any):
+        return self.bind(**kwargs)
+
+    def _reply(self, messages: List[BaseMessage]) -> AIMessage:
+        return AIMessage(content=self.reply)
+
+    def _result(self, messages: List[BaseMessage]) -> ChatResult:
+        if random.random() < self.error_rate:
+            raise RuntimeError("injected provider error")
+        return ChatResult(generations=[ChatGeneration(message=self._reply(messages))])
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        self.calls += 1
+        time.sleep(self.latency())
+        result = self._result(messages)
+        if run_manager is not None:
+            run_manager.on_llm_new_token(result.generations[0].text)
+        return result
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        self.calls += 1
+        await asyncio.sleep(self.latency())
+        result = self._result(messages)
+        if run_manager is not None:
+            await run_manager.on_llm_new_token(result.generations[0].text)
+        return result
+
+
+def tool_call_message(
+    tool: str, args: Optional[Dict[str, Any]] = None, call_id: str = "call-1"
+) -> AIMessage:
+    """AI message calling `tool` once."""
+    return AIMessage(
+        content="", tool_calls=[{"name": tool, "args": args or {}, "id": call_id}]
+    )
+
+
+class ScriptedChatModel(LatencyFakeChatModel):
+    """
+    Offline chat model that plays back a script of replies.
+
+    Call N returns entry N of `script`: an AIMessage, or a callable that
+    builds one from the prompt messages. Once the script runs out the last
+    entry repeats, or with `cycle=True` the script starts over. Every
+    prompt is kept in `prompts`.
+    """
+
+    # AIMessage or Callable[[List[BaseMessage]], AIMessage] entries; not
+    # validated, since pydantic would try to build messages from callables.
+    script: List[Any]
+    cycle: bool = False
+    prompts: List[List[BaseMessage]] = Field(default_factory=list)
+
+    def _reply(self, messages: List[BaseMessage]) -> AIMessage:
+        self.prompts.append(list(messages))
+        index = self.calls - 1
+        if self.cycle:
+            index %= len(self.script)
+        entry = self.script[min(index, len(self.script) - 1)]
+        # Copied, since LangChain assigns ids to the messages it returns.
+        return entry(messages) if callable(entry) else entry.model_copy(deep=True)
+
+    def prompt_chars(self) -> List[int]:
+        """Characters of message content in each recorded prompt."""
+        return [sum(len(str(m.content)) for m in p) for p in self.prompts]
+
+
+class ReplayChatModel(BaseChatModel):
+    """
+    Serves recorded model responses in order, for offline replay.
+
+    `calls` holds entries as written by the traffic recorder:
+    {"latency": seconds, "message": message_to_dict(...)}. Once the
+    recording runs out, an empty AI message ends the turn and `misses` is
+    incremented, which signals the replayed agent diverged from the trace.
+    """
+
+    calls: List[Dict[str, Any]] = Field(default_factory=list)
+    replay_latency: bool = True
+    cursor: int = 0
+    misses: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "replay-fake"
+
+    def bind_tools(self, tools: Any, **kwargs: Any):
+        return self.bind(**kwargs)
+
+    def _next(self) -> Tuple[float, BaseMessage]:
+        if self.cursor >= len(self.calls):
+            self.misses += 1
+            return 0.0, AIMessage(content="")
+        call = self.calls[self.cursor]
+        self.cursor += 1
+        latency = call.get("latency", 0.0) if self.replay_latency else 0.0
+        return latency, messages_from_dict([call["message"]])[0]
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        latency, message = self._next()
+        time.sleep(latency)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        latency, message = self._next()
+        await asyncio.sleep(latency)
+        return ChatResult(generations=[ChatGeneration(message=message)])
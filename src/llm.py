@@ -0,0 +1,323 @@
+# src/llm.py
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional, Sequence
+
+from langchain_core.callbacks import (
+    AsyncCallbackManager,
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatResult
+from pydantic import ConfigDict, Field, model_validator
+
+
+class LatencyTracker:
+    """
+    Rolling window of model call latencies.
+
+    The hedge deadline is a percentile of this window, so it follows the
+    provider's current behaviour instead of a fixed timeout.
+    """
+
+    def __init__(
+        self,
+        window: int = 256,
+        percentile: float = 0.95,
+        min_samples: int = 20,
+        floor: float = 0.05,
+    ):
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.floor = floor
+        self._samples: deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def quantile(self, q: float) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        index = min(len(samples) - 1, int(q * len(samples)))
+        return samples[index]
+
+    def deadline(self) -> Optional[float]:
+        """Seconds to wait before hedging, or None while still warming up."""
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+        return max(self.floor, self.quantile(self.percentile))
+
+
+class RetryBudget:
+    """
+    Token bucket shared by every model call in the process.
+
+    Each original request deposits `ratio` tokens and each retry or hedge
+    withdraws one, so extra load stays at roughly `ratio` of real traffic.
+    During a provider brownout the bucket drains and retries stop instead
+    of multiplying the load. `min_per_second` keeps a small trickle of
+    retries available when traffic is low.
+    """
+
+    def __init__(
+        self,
+        ratio: float = 0.1,
+        min_per_second: float = 1.0,
+        max_tokens: float = 20.0,
+    ):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.max_tokens = max_tokens
+        self._tokens = max_tokens
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._last_refill
+        self._last_refill = now
+        self._tokens = min(
+            self.max_tokens, self._tokens + elapsed * self.min_per_second
+        )
+
+    def deposit(self) -> None:
+        with self._lock:
+            self._refill()
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def try_withdraw(self) -> bool:
+        with self._lock:
+            self._refill()
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return True
+            return False
+
+
+def full_jitter(attempt: int, base: float, cap: float) -> float:
+    """Exponential backoff with full jitter."""
+    return random.uniform(0, min(cap, base * (2**attempt)))
+
+
+def _child_callbacks(
+    run_manager: Optional[AsyncCallbackManagerForLLMRun],
+) -> Optional[AsyncCallbackManager]:
+    """Callbacks for a model call nested under `run_manager`'s run."""
+    if run_manager is None:
+        return None
+    manager = AsyncCallbackManager(handlers=[], parent_run_id=run_manager.run_id)
+    manager.set_handlers(run_manager.inheritable_handlers)
+    manager.add_tags(run_manager.inheritable_tags)
+    manager.add_metadata(run_manager.inheritable_metadata)
+    return manager
+
+
+# Shared across all hedged models so the budget and the deadline reflect
+# the whole server rather than a single session.
+default_latency_tracker = LatencyTracker()
+default_retry_budget = RetryBudget()
+
+
+class HedgedChatModel(BaseChatModel):
+    """
+    Wraps a chat model with hedged requests and budgeted, jittered retries.
+
+    - If a call runs past the tracker's percentile deadline, a duplicate is
+      sent and whichever finishes first wins; the other is cancelled.
+    - Failed calls are retried with full-jitter backoff, but only while the
+      shared retry budget allows it.
+
+    Every attempt goes through the inner model's rate limiter. The primary
+    call streams into this run's callbacks; a hedge runs as a child run so
+    its tokens are not mixed with the primary's.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    inner: BaseChatModel
+    tracker: LatencyTracker = Field(default_factory=lambda: default_latency_tracker)
+    budget: RetryBudget = Field(default_factory=lambda: default_retry_budget)
+    max_retries: int = 2
+    backoff_base: float = 0.2
+    backoff_cap: float = 5.0
+    stats: Dict[str, int] = Field(
+        default_factory=lambda: {
+            "requests": 0,
+            "hedges": 0,
+            "hedge_wins": 0,
+            "retries": 0,
+            "budget_exhausted": 0,
+        }
+    )
+    # Identifier of the wrapped model. Together with `profile` and the
+    # LangSmith params below, it makes the wrapper look like `inner` to code
+    # that inspects the model, e.g. deepagents' context-window triggers and
+    # provider profile lookup.
+    model: Optional[str] = None
+
+    @model_validator(mode="after")
+    def _inherit_identity(self) -> "HedgedChatModel":
+        if self.profile is None:
+            self.profile = self.inner.profile
+        if self.model is None:
+            for attr in ("model_name", "model"):
+                value = getattr(self.inner, attr, None)
+                if isinstance(value, str):
+                    self.model = value
+                    break
+        return self
+
+    @property
+    def _llm_type(self) -> str:
+        return f"hedged-{self.inner._llm_type}"
+
+    def _get_ls_params(self, stop: Optional[List[str]] = None, **kwargs: Any):
+        return self.inner._get_ls_params(stop=stop, **kwargs)
+
+    def bind_tools(self, tools: Sequence[Any], **kwargs: Any):
+        # Let the inner model format the tools, then bind the result to the
+        # wrapper so every call still goes through the hedging path.
+        bound = self.inner.bind_tools(tools, **kwargs)
+        return self.bind(**bound.kwargs)
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        # The sync path cannot race two calls cheaply; it only gets retries.
+        self.stats["requests"] += 1
+        self.budget.deposit()
+        attempt = 0
+        while True:
+            try:
+                if self.inner.rate_limiter is not None:
+                    self.inner.rate_limiter.acquire(blocking=True)
+                return self.inner._generate(
+                    messages, stop=stop, run_manager=run_manager, **kwargs
+                )
+            except Exception:
+                if not self._may_retry(attempt):
+                    raise
+                time.sleep(full_jitter(attempt, self.backoff_base, self.backoff_cap))
+                attempt += 1
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        self.stats["requests"] += 1
+        self.budget.deposit()
+        attempt = 0
+        while True:
+            try:
+                return await self._hedged_call(messages, stop, run_manager, **kwargs)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                if not self._may_retry(attempt):
+                    raise
+                await asyncio.sleep(
+                    full_jitter(attempt, self.backoff_base, self.backoff_cap)
+                )
+                attempt += 1
+
+    def _may_retry(self, attempt: int) -> bool:
+        if attempt >= self.max_retries:
+            return False
+        if not self.budget.try_withdraw():
+            self.stats["budget_exhausted"] += 1
+            return False
+        self.stats["retries"] += 1
+        return True
+
+    async def _primary_call(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]],
+        run_manager: Optional[AsyncCallbackManagerForLLMRun],
+        **kwargs: Any,
+    ) -> ChatResult:
+        # Calling `_agenerate` directly skips the limiter that the inner
+        # model's own `agenerate` would apply.
+        if self.inner.rate_limiter is not None:
+            await self.inner.rate_limiter.aacquire(blocking=True)
+        return await self.inner._agenerate(
+            messages, stop=stop, run_manager=run_manager, **kwargs
+        )
+
+    async def _hedge_call(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]],
+        run_manager: Optional[AsyncCallbackManagerForLLMRun],
+        **kwargs: Any,
+    ) -> ChatResult:
+        result = await self.inner.agenerate(
+            [messages], stop=stop, callbacks=_child_callbacks(run_manager), **kwargs
+        )
+        return ChatResult(
+            generations=result.generations[0], llm_output=result.llm_output
+        )
+
+    async def _hedged_call(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]],
+        run_manager: Optional[AsyncCallbackManagerForLLMRun],
+        **kwargs: Any,
+    ) -> ChatResult:
+        started = time.monotonic()
+        primary = asyncio.create_task(
+            self._primary_call(messages, stop, run_manager, **kwargs)
+        )
+        tasks = {primary}
+        try:
+            deadline = self.tracker.deadline()
+            done, _ = await asyncio.wait(tasks, timeout=deadline)
+            if not done:
+                if self.budget.try_withdraw():
+                    self.stats["hedges"] += 1
+                    hedge = asyncio.create_task(
+                        self._hedge_call(messages, stop, run_manager, **kwargs)
+                    )
+                    tasks.add(hedge)
+                else:
+                    self.stats["budget_exhausted"] += 1
+
+            pending = set(tasks)
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            self.stats["hedge_wins"] += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            # Losers are cancelled. The primary's elapsed time is always
+            # recorded, even when cut short, so slow tails stay visible to
+            # the tracker instead of being hidden by winning hedges.
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            self.tracker.observe(time.monotonic() - started)
@@ -0,0 +1,223 @@
+# src/profiling.py
+import asyncio
+import sys
+import threading
+from collections import Counter
+from contextvars import ContextVar, Token
+from types import FrameType
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+# Root for event-loop samples taken while a task outside the turn runs.
+OTHER_TASKS = "loop:other"
+
+# Set while a profiled turn runs; tasks the turn spawns inherit it.
+_current: ContextVar[Optional["TurnProfiler"]] = ContextVar(
+    "turn_profiler", default=None
+)
+
+
+# (parent_run_id, label, thread ident, asyncio task or None)
+_Run = Tuple[Optional[UUID], Optional[str], int, Optional[asyncio.Task]]
+
+
+class TurnProfiler(BaseCallbackHandler):
+    """
+    Sampling profiler for a single agent turn.
+
+    A background thread samples the Python stack of the thread that entered
+    the profiler (the event loop) every `interval` seconds. Passed as a
+    LangChain callback, it also tracks which graph node and tool are
+    running, and prefixes every sample with that path, so the output shows
+    `node:model;...` and `tool:get_user_info;...` frames. Sync tools and
+    nodes run in executor threads; each run remembers the thread it started
+    in, and those threads are sampled too while the run is active.
+
+    The event loop is shared with other sessions. A loop sample only gets
+    the turn's boundaries when the running task belongs to the turn (it was
+    spawned inside the `with` block) or the loop is idle, i.e. the turn is
+    waiting. Samples of other tasks go under a separate `loop:other` root.
+
+    Output is in collapsed-stack format ("a;b;c <count>" per line), which
+    flamegraph.pl, speedscope and inferno read directly.
+    """
+
+    # Keep boundary tracking in order with the graph instead of deferring
+    # handlers to an executor.
+    run_inline = True
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.samples: Counter[str] = Counter()
+        # run_id -> (parent_run_id, label, thread ident, asyncio task), in
+        # start order. Every active run is kept so tools can be walked up to
+        # their node; only graph nodes, tools and model calls carry a label.
+        self._active: Dict[UUID, _Run] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._target: Optional[int] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._token: Optional[Token] = None
+
+    # --- graph / tool boundaries -------------------------------------------
+
+    def _push(
+        self, run_id: UUID, parent_run_id: Optional[UUID], label: Optional[str]
+    ) -> None:
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:  # executor thread, no running loop
+            task = None
+        self._active[run_id] = (parent_run_id, label, threading.get_ident(), task)
+
+    def _pop(self, run_id: UUID) -> None:
+        self._active.pop(run_id, None)
+
+    def on_chain_start(
+        self,
+        serialized: Dict[str, Any],
+        inputs: Dict[str, Any],
+        *,
+        run_id: UUID,
+        parent_run_id: Optional[UUID] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        **kwargs: Any,
+    ) -> None:
+        node = (metadata or {}).get("langgraph_node")
+        label = f"node:{node}" if node and kwargs.get("name") == node else None
+        self._push(run_id, parent_run_id, label)
+
+    def on_chain_end(self, outputs: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._pop(run_id)
+
+    def on_chain_error(
+        self, error: BaseException, *, run_id: UUID, **kwargs: Any
+    ) -> None:
+        self._pop(run_id)
+
+    def on_chat_model_start(
+        self,
+        serialized: Dict[str, Any],
+        messages: List[List[Any]],
+        *,
+        run_id: UUID,
+        parent_run_id: Optional[UUID] = None,
+        **kwargs: Any,
+    ) -> None:
+        self._push(run_id, parent_run_id, "model_call")
+
+    def on_llm_end(self, response: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._pop(run_id)
+
+    def on_llm_error(
+        self, error: BaseException, *, run_id: UUID, **kwargs: Any
+    ) -> None:
+        self._pop(run_id)
+
+    def on_tool_start(
+        self,
+        serialized: Dict[str, Any],
+        input_str: str,
+        *,
+        run_id: UUID,
+        parent_run_id: Optional[UUID] = None,
+        **kwargs: Any,
+    ) -> None:
+        name = kwargs.get("name") or (serialized or {}).get("name", "tool")
+        self._push(run_id, parent_run_id, f"tool:{name}")
+
+    def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._pop(run_id)
+
+    def on_tool_error(
+        self, error: BaseException, *, run_id: UUID, **kwargs: Any
+    ) -> None:
+        self._pop(run_id)
+
+    def _boundary_path(
+        self,
+        active: Dict[UUID, _Run],
+        thread: int,
+        task: Optional[asyncio.Task] = None,
+    ) -> List[str]:
+        # The most recently started run in this thread (and task, when
+        # known) is the innermost one.
+        in_thread = [r for r in reversed(active) if active[r][2] == thread]
+        run_id: Optional[UUID] = next(
+            (r for r in in_thread if active[r][3] is task),
+            in_thread[0] if in_thread else None,
+        )
+        path: List[str] = []
+        while run_id in active:
+            parent, label, _, _ = active[run_id]
+            if label is not None:
+                path.append(label)
+            run_id = parent
+        return path[::-1]
+
+    def _loop_task(self, frame: FrameType) -> Tuple[bool, Optional[asyncio.Task]]:
+        # Returns (busy, task): the task whose coroutine is on the loop's
+        # stack, or (False, None) when the loop is waiting for I/O.
+        on_stack = set()
+        while frame is not None:
+            on_stack.add(frame)
+            frame = frame.f_back
+        try:
+            tasks = asyncio.all_tasks(self._loop)
+        except RuntimeError:  # task set changed while copying
+            return True, None
+        for task in tasks:
+            if getattr(task.get_coro(), "cr_frame", None) in on_stack:
+                return True, task
+        return False, None
+
+    # --- sampling ------------------------------------------------------------
+
+    def _sample(self) -> None:
+        while not self._stop.wait(self.interval):
+            active = dict(self._active)
+            threads = {self._target} | {run[2] for run in active.values()}
+            frames = sys._current_frames()
+            for thread in threads:
+                frame = frames.get(thread)
+                if frame is None:
+                    continue
+                task = None
+                if thread == self._target:
+                    busy, task = self._loop_task(frame)
+                    if busy and (
+                        task is None or task.get_context().get(_current) is not self
+                    ):
+                        path = [OTHER_TASKS]
+                    else:
+                        path = self._boundary_path(active, thread, task)
+                else:
+                    path = self._boundary_path(active, thread)
+                stack: List[str] = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(
+                        f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})"
+                    )
+                    frame = frame.f_back
+                self.samples[";".join(path + stack[::-1])] += 1
+
+    def __enter__(self) -> "TurnProfiler":
+        self._target = threading.get_ident()
+        self._loop = asyncio.get_running_loop()
+        self._token = _current.set(self)
+        self._thread = threading.Thread(
+            target=self._sample, name="turn-profiler", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self._stop.set()
+        self._thread.join()
+        _current.reset(self._token)
+
+    def collapsed(self) -> str:
+        return "\n".join(f"{stack} {count}" for stack, count in self.samples.items())
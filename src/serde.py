@@ -0,0 +1,170 @@
+# src/serde.py
+import math
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import orjson
+import ormsgpack
+from langchain_core.messages import (
+    AIMessage,
+    AIMessageChunk,
+    BaseMessage,
+    ChatMessage,
+    FunctionMessage,
+    HumanMessage,
+    RemoveMessage,
+    SystemMessage,
+    ToolMessage,
+)
+from langgraph.checkpoint.serde.base import SerializerProtocol
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+
+# Marks a LangChain message inside an encoded payload. Messages are stored
+# as {MESSAGE_KEY: type, "data": fields}, with default-valued fields left
+# out, instead of full constructor calls.
+MESSAGE_KEY = "__lc_message__"
+MESSAGE_TYPES = {
+    cls.model_fields["type"].default: cls
+    for cls in (
+        AIMessage,
+        AIMessageChunk,
+        ChatMessage,
+        FunctionMessage,
+        HumanMessage,
+        RemoveMessage,
+        SystemMessage,
+        ToolMessage,
+    )
+}
+ZSTD_SUFFIX = "+zstd"
+# Type tags are prefixed so they never clash with JsonPlusSerializer's own
+# "msgpack"/"json" tags, which are still read through the fallback.
+TAG_PREFIX = "lc-"
+
+_SCALARS = (str, int, float, bool, type(None))
+
+
+class UnsupportedType(TypeError):
+    """Raised when a value can't be represented by the fast backends."""
+
+
+def pack(obj: Any, allow_nan: bool = True) -> Any:
+    """
+    Convert `obj` to plain JSON/msgpack data.
+
+    Only exact builtin containers, scalars and LangChain messages are
+    accepted; anything else raises UnsupportedType so callers can fall back
+    to a lossless serializer instead of silently changing types. With
+    `allow_nan=False`, NaN and infinities are rejected too, since JSON
+    cannot represent them (orjson writes them as null).
+    """
+    if type(obj) in _SCALARS:
+        if not allow_nan and type(obj) is float and not math.isfinite(obj):
+            raise UnsupportedType(f"non-finite float: {obj!r}")
+        return obj
+    if type(obj) is list:
+        return [pack(v, allow_nan) for v in obj]
+    if type(obj) is dict:
+        out = {}
+        for k, v in obj.items():
+            if type(k) is not str:
+                raise UnsupportedType(f"non-str key: {k!r}")
+            out[k] = pack(v, allow_nan)
+        return out
+    if isinstance(obj, BaseMessage) and MESSAGE_TYPES.get(obj.type) is type(obj):
+        data = obj.model_dump(exclude_defaults=True)
+        return {MESSAGE_KEY: obj.type, "data": pack(data, allow_nan)}
+    raise UnsupportedType(type(obj).__name__)
+
+
+def unpack(obj: Any) -> Any:
+    """Inverse of `pack`: revive LangChain messages."""
+    if type(obj) is list:
+        return [unpack(v) for v in obj]
+    if type(obj) is dict:
+        if MESSAGE_KEY in obj and len(obj) == 2:
+            return MESSAGE_TYPES[obj[MESSAGE_KEY]](**obj["data"])
+        return {k: unpack(v) for k, v in obj.items()}
+    return obj
+
+
+def _orjson_dumps(data: Any) -> bytes:
+    return orjson.dumps(data)
+
+
+def _msgpack_dumps(data: Any) -> bytes:
+    return ormsgpack.packb(data)
+
+
+BACKENDS: Dict[str, Tuple[Callable[[Any], bytes], Callable[[bytes], Any]]] = {
+    "orjson": (_orjson_dumps, orjson.loads),
+    "msgpack": (_msgpack_dumps, ormsgpack.unpackb),
+}
+
+
+class Serializer(SerializerProtocol):
+    """
+    Checkpoint serializer backed by orjson or msgpack.
+
+    Plain data and message lists take the fast path; anything else (Send,
+    Command, dataclasses, ...) is handed to LangGraph's JsonPlusSerializer.
+    The "jsonplus" backend skips the fast path entirely. Payloads of at
+    least `compress_threshold` bytes are zstd-compressed.
+    """
+
+    def __init__(
+        self,
+        backend: str = "msgpack",
+        compress_threshold: Optional[int] = None,
+        fallback: Optional[SerializerProtocol] = None,
+    ):
+        if backend != "jsonplus" and backend not in BACKENDS:
+            raise ValueError(f"Unknown serializer backend: {backend}")
+        if compress_threshold is not None and zstandard is None:
+            raise ImportError("zstd compression requires the 'zstandard' package")
+        self.backend = backend
+        self.compress_threshold = compress_threshold
+        self.fallback = fallback or JsonPlusSerializer()
+
+    def dumps_typed(self, obj: Any) -> Tuple[str, bytes]:
+        try:
+            if self.backend == "jsonplus":
+                raise UnsupportedType(self.backend)
+            type_ = TAG_PREFIX + self.backend
+            packed = pack(obj, allow_nan=self.backend != "orjson")
+            data = BACKENDS[self.backend][0](packed)
+        except TypeError:
+            type_, data = self.fallback.dumps_typed(obj)
+        if (
+            self.compress_threshold is not None
+            and len(data) >= self.compress_threshold
+        ):
+            return type_ + ZSTD_SUFFIX, zstandard.compress(data)
+        return type_, data
+
+    def loads_typed(self, data: Tuple[str, bytes]) -> Any:
+        type_, payload = data
+        if type_.endswith(ZSTD_SUFFIX):
+            if zstandard is None:
+                raise ImportError("zstd payload requires the 'zstandard' package")
+            type_ = type_[: -len(ZSTD_SUFFIX)]
+            payload = zstandard.decompress(payload)
+        if type_.startswith(TAG_PREFIX):
+            return unpack(BACKENDS[type_[len(TAG_PREFIX) :]][1](payload))
+        return self.fallback.loads_typed((type_, payload))
+
+
+def make_serializer(
+    backend: str = "jsonplus", compress_threshold: Optional[int] = None
+) -> Optional[SerializerProtocol]:
+    """
+    Build the checkpoint serializer, or None to keep LangGraph's default.
+    """
+    if backend == "jsonplus" and compress_threshold is None:
+        return None
+    return Serializer(backend=backend, compress_threshold=compress_threshold)
@@ -2,16 +2,35 @@
 import asyncio
 from typing import Any, Dict, List, Optional
 
+from langchain_core.callbacks import BaseCallbackHandler
 from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
-from langchain_core.runnables import Runnable
+from langchain_core.runnables import Runnable, RunnableConfig
 
 from src.agents.stateful_agent import CustomState
+from src.tool_outputs import offload_stats
+
+
+def turn_tokens(messages: List[BaseMessage]) -> int:
+    """Total model tokens reported by AI messages after the last human message."""
+    total = 0
+    for msg in reversed(messages):
+        if isinstance(msg, HumanMessage):
+            break
+        usage = getattr(msg, "usage_metadata", None)
+        if usage:
+            total += usage.get("total_tokens", 0)
+    return total
 
 
 class AgentSession:
-    def __init__(self, session_id: str, agent_runnable: Runnable):
+    def __init__(
+        self, session_id: str, agent_runnable: Runnable, tenant: str = "default"
+    ):
         self.session_id = session_id
         self.agent_runnable = agent_runnable
+        self.tenant = tenant
+        # Model tokens used by the most recent turn, for quota accounting.
+        self.last_turn_tokens = 0
         self._state: CustomState = CustomState(
             messages=[],
             user_name=None,
@@ -22,7 +41,16 @@ class AgentSession:
     def state(self) -> CustomState:
         return self._state
 
-    async def chat(self, text: str) -> str:
+    def close(self) -> None:
+        """Release per-session resources when the session is deleted."""
+
+    def tool_output_stats(self) -> Dict[str, int]:
+        """Bytes and estimated prompt tokens saved by offloaded tool results."""
+        return offload_stats(self._state.get("messages", []))
+
+    async def chat(
+        self, text: str, callbacks: Optional[List[BaseCallbackHandler]] = None
+    ) -> str:
         """Run a single turn and update internal state."""
         async with self._lock:
             base_state = dict(self._state)
@@ -30,8 +58,14 @@ class AgentSession:
             base_state["messages"] = base_state.get("messages", []) + [
                 HumanMessage(content=text)
             ]
-            new_state: CustomState = await self.agent_runnable.ainvoke(base_state)
+            config: Optional[RunnableConfig] = (
+                {"callbacks": callbacks} if callbacks else None
+            )
+            new_state: CustomState = await self.agent_runnable.ainvoke(
+                base_state, config=config
+            )
             self._state = new_state
+            self.last_turn_tokens = turn_tokens(new_state["messages"])
 
             # extract last AI message
             reply = ""
@@ -59,9 +93,10 @@ class DeepAgentSession(AgentSession):
         session_id: str,
         agent_runnable: Runnable,
         thread_id: Optional[str] = None,
+        tenant: str = "default",
     ):
         # Keep session_id & agent_runnable from base, but don't rely on base _state layout
-        super().__init__(session_id, agent_runnable)
+        super().__init__(session_id, agent_runnable, tenant)
 
         # For DeepAgents, this thread_id is what binds all turns together
         self.thread_id = thread_id or session_id
@@ -70,12 +105,21 @@ class DeepAgentSession(AgentSession):
         # Not a "real" CustomState anymore, but still useful.
         self._state: Dict[str, Any] = {"messages": []}
 
+    def close(self) -> None:
+        # The compiled graph, and its checkpointer, may be shared with other
+        # sessions of the same template; drop only this session's thread.
+        checkpointer = getattr(self.agent_runnable, "checkpointer", None)
+        if checkpointer is not None and hasattr(checkpointer, "delete_thread"):
+            checkpointer.delete_thread(self.thread_id)
+
     @property
     def messages(self) -> List[BaseMessage]:
         """Convenience: access the last known messages list."""
         return self._state.get("messages", [])
 
-    async def chat(self, text: str) -> str:
+    async def chat(
+        self, text: str, callbacks: Optional[List[BaseCallbackHandler]] = None
+    ) -> str:
         """
         Run a single turn for a deep agent.
 
@@ -90,11 +134,13 @@ class DeepAgentSession(AgentSession):
                 ]
             }
 
-            config = {
+            config: RunnableConfig = {
                 "configurable": {
                     "thread_id": self.thread_id,
                 }
             }
+            if callbacks:
+                config["callbacks"] = callbacks
 
             # 2) Invoke the deep agent graph
             result: Dict[str, Any] = await self.agent_runnable.ainvoke(
@@ -105,6 +151,7 @@ class DeepAgentSession(AgentSession):
             # deepagents create_deep_agent returns a dict with "messages"
             messages: List[BaseMessage] = result.get("messages", [])
             self._state["messages"] = messages
+            self.last_turn_tokens = turn_tokens(messages)
 
             # 3) Extract last AI message (like in AgentSession)
             reply = ""
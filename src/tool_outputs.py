@@ -0,0 +1,168 @@
+# src/tool_outputs.py
+import json
+import re
+from dataclasses import replace
+from typing import Any, Awaitable, Callable, Dict, List
+
+from langchain.agents.middleware import AgentMiddleware
+from langchain.agents.middleware.types import ToolCallRequest
+from langchain.tools import tool
+from langchain_core.messages import AIMessage, BaseMessage, ToolMessage
+from langgraph.types import Command
+
+from src.backends import BlobStore
+
+# response_metadata key on truncated ToolMessages. Metadata is kept in state
+# but never sent to the model.
+OFFLOAD_KEY = "offloaded"
+READ_TOOL_NAME = "read_tool_output"
+# Rough chars-per-token ratio, as used by LangChain's approximate counter.
+CHARS_PER_TOKEN = 4
+
+_HANDLE = re.compile(r"[0-9a-f]{64}")
+
+
+def _text(content: Any) -> str:
+    if isinstance(content, str):
+        return content
+    parts = []
+    for block in content:
+        if isinstance(block, str):
+            parts.append(block)
+        elif isinstance(block, dict) and block.get("type") == "text":
+            parts.append(block.get("text", ""))
+        else:
+            parts.append(json.dumps(block, default=str))
+    return "\n".join(parts)
+
+
+class ToolOutputOffloader(AgentMiddleware):
+    """
+    Caps the size of tool results kept in the message history.
+
+    A result longer than `max_chars` is written to `store` and replaced by
+    its first `max_chars` characters and a handle. The model can page
+    through the full result with the `read_tool_output` tool, which this
+    middleware registers. Sizes before and after are recorded in the
+    message's response_metadata for `offload_stats`.
+    """
+
+    def __init__(self, store: BlobStore, max_chars: int = 4000):
+        super().__init__()
+        self.store = store
+        self.max_chars = max_chars
+        self.tools = [self._read_tool()]
+
+    def _read_tool(self):
+        store, max_chars = self.store, self.max_chars
+
+        @tool(READ_TOOL_NAME)
+        def read_tool_output(handle: str, offset: int = 0, limit: int = max_chars):
+            """Read part of a tool result that was too large to return in full.
+
+            Args:
+                handle: The handle given in the truncated result.
+                offset: Character offset to start reading from.
+                limit: Maximum number of characters to return.
+            """
+            if not _HANDLE.fullmatch(handle):
+                return f"Invalid handle: {handle}"
+            if limit <= 0:
+                return f"Invalid limit: {limit}; it must be a positive number"
+            try:
+                text = store.read_text(handle)
+            except FileNotFoundError:
+                return f"No stored tool output for handle {handle}"
+            # A negative offset would slice from the end of the text.
+            offset = max(0, offset)
+            end = offset + min(limit, max_chars)
+            chunk = text[offset:end]
+            if end < len(text):
+                chunk += f"\n\n[{len(text) - end} more characters from offset {end}]"
+            return chunk
+
+        return read_tool_output
+
+    def _offload(self, result: ToolMessage | Command) -> ToolMessage | Command:
+        if isinstance(result, ToolMessage):
+            return self._offload_message(result)
+        # Tools returning a Command put their ToolMessage in the state update.
+        update = result.update if isinstance(result, Command) else None
+        if not isinstance(update, dict) or not update.get("messages"):
+            return result
+        messages = [
+            self._offload_message(msg) if isinstance(msg, ToolMessage) else msg
+            for msg in update["messages"]
+        ]
+        return replace(result, update={**update, "messages": messages})
+
+    def _offload_message(self, result: ToolMessage) -> ToolMessage:
+        if result.name == READ_TOOL_NAME:
+            return result
+        text = _text(result.content)
+        if len(text) <= self.max_chars:
+            return result
+        data = text.encode("utf-8")
+        handle = self.store.put(data)
+        inline = (
+            f"{text[: self.max_chars]}\n\n[Truncated: showing {self.max_chars} "
+            f"of {len(text)} characters. Call {READ_TOOL_NAME}(handle="
+            f'"{handle}", offset={self.max_chars}) to read more.]'
+        )
+        metadata = {
+            "handle": handle,
+            "chars": len(text),
+            "inline_chars": len(inline),
+            "bytes": len(data),
+            "inline_bytes": len(inline.encode("utf-8")),
+        }
+        response_metadata = {**result.response_metadata, OFFLOAD_KEY: metadata}
+        return result.model_copy(
+            update={"content": inline, "response_metadata": response_metadata}
+        )
+
+    def wrap_tool_call(
+        self,
+        request: ToolCallRequest,
+        handler: Callable[[ToolCallRequest], ToolMessage | Command],
+    ) -> ToolMessage | Command:
+        return self._offload(handler(request))
+
+    async def awrap_tool_call(
+        self,
+        request: ToolCallRequest,
+        handler: Callable[[ToolCallRequest], Awaitable[ToolMessage | Command]],
+    ) -> ToolMessage | Command:
+        return self._offload(await handler(request))
+
+
+def offload_stats(messages: List[BaseMessage]) -> Dict[str, int]:
+    """
+    Savings from offloaded tool results in a message history.
+
+    `prompt_tokens_saved` estimates the tokens kept out of model prompts:
+    each result's removed characters, divided by CHARS_PER_TOKEN, times the
+    number of model calls made after it.
+    """
+    offloaded = bytes_saved = tokens_saved = 0
+    later_calls = 0
+    for msg in reversed(messages):
+        if isinstance(msg, AIMessage):
+            later_calls += 1
+            continue
+        meta = (
+            msg.response_metadata.get(OFFLOAD_KEY)
+            if isinstance(msg, ToolMessage)
+            else None
+        )
+        if not meta:
+            continue
+        offloaded += 1
+        bytes_saved += meta["bytes"] - meta["inline_bytes"]
+        removed_chars = meta["chars"] - meta["inline_chars"]
+        tokens_saved += removed_chars // CHARS_PER_TOKEN * later_calls
+    return {
+        "offloaded": offloaded,
+        "bytes_saved": bytes_saved,
+        "prompt_tokens_saved": tokens_saved,
+    }
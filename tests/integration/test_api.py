@@ -1,10 +1,74 @@
+import ormsgpack
+import pytest
 from fastapi.testclient import TestClient
+from langchain_core.messages import AIMessage
 
+from app.core.agent_factory import agent_factory
+from app.core.scheduler import TurnScheduler
+from app.core.session_manager import session_manager
 from app.main import app
+from app.server.config import Settings, TenantConfig
+from app.server.dependencies import (
+    get_agent_factory,
+    get_settings,
+    get_turn_scheduler,
+)
+from src.fake_models import LatencyFakeChatModel, ScriptedChatModel
 
 client = TestClient(app)
 
 
+@pytest.fixture
+def offline_agents():
+    """Build agents around an offline fake model instead of Gemini."""
+    app.dependency_overrides[get_agent_factory] = lambda: (
+        lambda template, settings: agent_factory(
+            template, settings, model=LatencyFakeChatModel(reply="offline")
+        )
+    )
+    yield
+    app.dependency_overrides.pop(get_agent_factory, None)
+
+
+# Reports 120 tokens of usage per call.
+METERED = AIMessage(
+    content="metered",
+    usage_metadata={"input_tokens": 100, "output_tokens": 20, "total_tokens": 120},
+)
+
+
+@pytest.fixture
+def tenants():
+    """Two keyed tenants, an admin key and a fresh scheduler."""
+    settings = Settings(
+        GOOGLE_API_KEY="test",
+        APP_API_KEY="admin-key",
+        TENANTS={
+            "acme": TenantConfig(api_key="acme-key", tokens_per_minute=60),
+            "full": TenantConfig(api_key="full-key", max_queued=0),
+        },
+    )
+    scheduler = TurnScheduler.from_settings(settings)
+    app.dependency_overrides[get_settings] = lambda: settings
+    app.dependency_overrides[get_turn_scheduler] = lambda: scheduler
+    app.dependency_overrides[get_agent_factory] = lambda: (
+        lambda template, s: agent_factory(
+            template, s, model=ScriptedChatModel(script=[METERED])
+        )
+    )
+    yield
+    for dependency in (get_settings, get_turn_scheduler, get_agent_factory):
+        app.dependency_overrides.pop(dependency, None)
+
+
+def create_as(key=None):
+    headers = {"X-API-Key": key} if key else {}
+    response = client.post(
+        "/api/v1/agents", json={"agent_template": "stateful_agent"}, headers=headers
+    )
+    return response.json()["agent_id"]
+
+
 def test_create_agent():
     response = client.post("/api/v1/agents", json={"agent_template": "stateful_agent"})
     assert response.status_code == 200
@@ -39,3 +103,120 @@ def test_chat_with_agent():
     )
     assert chat_response.status_code == 200
     assert "reply" in chat_response.json()
+
+
+def test_chat_profile_requires_admin():
+    create_response = client.post(
+        "/api/v1/agents", json={"agent_template": "stateful_agent"}
+    )
+    agent_id = create_response.json()["agent_id"]
+    chat_response = client.post(
+        f"/api/v1/agents/{agent_id}/chat?profile=true", json={"message": "hello"}
+    )
+    assert chat_response.status_code == 403
+
+
+def test_list_templates_after_startup():
+    with TestClient(app) as started:
+        response = started.get("/api/v1/templates")
+    assert response.status_code == 200
+    names = {t["name"] for t in response.json()["templates"]}
+    assert names == {"stateful_agent", "stateful_deep_agent"}
+
+
+def test_create_agent_unknown_template():
+    response = client.post("/api/v1/agents", json={"agent_template": "nope"})
+    assert response.status_code == 400
+
+
+def test_tool_output_stats():
+    create_response = client.post(
+        "/api/v1/agents", json={"agent_template": "stateful_agent"}
+    )
+    agent_id = create_response.json()["agent_id"]
+    response = client.get(f"/api/v1/agents/{agent_id}/tool-outputs")
+    assert response.status_code == 200
+    assert response.json()["bytes_saved"] == 0
+    assert client.get("/api/v1/agents/missing/tool-outputs").status_code == 404
+
+
+def test_msgpack_responses(offline_agents):
+    agent_id = client.post(
+        "/api/v1/agents", json={"agent_template": "stateful_agent"}
+    ).json()["agent_id"]
+    headers = {"Accept": "application/msgpack"}
+
+    listed = client.get("/api/v1/agents", headers=headers)
+    assert listed.headers["content-type"] == "application/msgpack"
+    assert agent_id in ormsgpack.unpackb(listed.content)["agents"]
+
+    chat = client.post(
+        f"/api/v1/agents/{agent_id}/chat", json={"message": "hi"}, headers=headers
+    )
+    assert chat.headers["content-type"] == "application/msgpack"
+    assert ormsgpack.unpackb(chat.content) == {
+        "reply": "offline",
+        "agent_id": agent_id,
+    }
+
+
+def test_sessions_are_scoped_to_tenant(tenants):
+    agent_id = create_as("acme-key")
+
+    own = client.get("/api/v1/agents", headers={"X-API-Key": "acme-key"})
+    assert agent_id in own.json()["agents"]
+    # Unknown keys fall back to the default tenant, which cannot see it.
+    other = client.get("/api/v1/agents", headers={"X-API-Key": "wrong"})
+    assert agent_id not in other.json()["agents"]
+    chat = client.post(f"/api/v1/agents/{agent_id}/chat", json={"message": "hi"})
+    assert chat.status_code == 404
+
+
+def test_quota_exceeded_returns_429_with_retry_after(tenants):
+    headers = {"X-API-Key": "acme-key"}
+    agent_id = create_as("acme-key")
+    url = f"/api/v1/agents/{agent_id}/chat"
+
+    # 120 tokens against a 60/minute quota leaves the bucket a minute short.
+    assert client.post(url, json={"message": "hi"}, headers=headers).status_code == 200
+    rejected = client.post(url, json={"message": "hi"}, headers=headers)
+    assert rejected.status_code == 429
+    assert 55 <= int(rejected.headers["Retry-After"]) <= 60
+
+    full_id = create_as("full-key")
+    queued = client.post(
+        f"/api/v1/agents/{full_id}/chat",
+        json={"message": "hi"},
+        headers={"X-API-Key": "full-key"},
+    )
+    assert queued.status_code == 429
+    assert queued.headers["Retry-After"] == "1"
+
+
+def test_tenant_metrics_requires_admin(tenants):
+    agent_id = create_as("acme-key")
+    client.post(
+        f"/api/v1/agents/{agent_id}/chat",
+        json={"message": "hi"},
+        headers={"X-API-Key": "acme-key"},
+    )
+
+    assert client.get("/api/v1/tenants/metrics").status_code == 403
+    tenant_key = {"X-API-Key": "acme-key"}
+    assert client.get("/api/v1/tenants/metrics", headers=tenant_key).status_code == 403
+    response = client.get("/api/v1/tenants/metrics", headers={"X-API-Key": "admin-key"})
+    assert response.status_code == 200
+    acme = response.json()["tenants"]["acme"]
+    assert acme["turns"] == 1 and acme["tokens"] == 120
+
+
+def test_create_reuses_startup_graph():
+    with TestClient(app) as started:
+        ids = [
+            started.post(
+                "/api/v1/agents", json={"agent_template": "stateful_agent"}
+            ).json()["agent_id"]
+            for _ in range(2)
+        ]
+    first, second = (session_manager.get_session(i) for i in ids)
+    assert first.agent_runnable is second.agent_runnable
@@ -0,0 +1,104 @@
+from fastapi.testclient import TestClient
+from langchain_core.messages import AIMessage
+
+from app.core.agent_factory import agent_factory
+from app.core.capture import TrafficRecorder
+from app.main import app
+from app.server.config import Settings, TenantConfig
+from app.server.dependencies import (
+    get_agent_factory,
+    get_settings,
+    get_traffic_recorder,
+)
+from benchmarks.replay import load_trace, replay
+from src.fake_models import ScriptedChatModel, tool_call_message
+
+
+def naming_model() -> ScriptedChatModel:
+    """Records the user's name on every odd call, answers on every even one."""
+    return ScriptedChatModel(
+        script=[
+            tool_call_message("update_user_info", {"name": "John"}),
+            AIMessage(content="answer"),
+        ],
+        cycle=True,
+    )
+
+
+def capture_trace(path):
+    """Record one session of the "acme" tenant."""
+    recorder = TrafficRecorder(str(path))
+    settings = Settings(
+        GOOGLE_API_KEY="test", TENANTS={"acme": TenantConfig(api_key="acme-key")}
+    )
+    overrides = {
+        get_settings: lambda: settings,
+        get_traffic_recorder: lambda: recorder,
+        get_agent_factory: lambda: (
+            lambda template, settings: agent_factory(
+                template, settings, model=naming_model()
+            )
+        ),
+    }
+    app.dependency_overrides.update(overrides)
+    try:
+        client = TestClient(app, headers={"X-API-Key": "acme-key"})
+        agent_id = client.post(
+            "/api/v1/agents", json={"agent_template": "stateful_agent"}
+        ).json()["agent_id"]
+        replies = [
+            client.post(
+                f"/api/v1/agents/{agent_id}/chat", json={"message": text}
+            ).json()["reply"]
+            for text in ("I am John", "who am I?")
+        ]
+        client.delete(f"/api/v1/agents/{agent_id}")
+    finally:
+        for dependency in overrides:
+            app.dependency_overrides.pop(dependency, None)
+        recorder.close()
+    return replies
+
+
+def test_trace_records_model_calls(tmp_path):
+    path = tmp_path / "trace.jsonl"
+    capture_trace(path)
+
+    events = load_trace(str(path))
+    assert [e["event"] for e in events] == [
+        "create_agent",
+        "chat",
+        "chat",
+        "delete_agent",
+    ]
+    assert {e["tenant"] for e in events} == {"acme"}
+    chat = events[1]
+    assert chat["message"] == "I am John" and chat["status"] == 200
+    assert len(chat["model_calls"]) == 2
+    assert chat["model_calls"][0]["message"]["data"]["tool_calls"][0]["args"] == {
+        "name": "John"
+    }
+
+
+async def test_replay_reproduces_trace_offline(tmp_path):
+    path = tmp_path / "trace.jsonl"
+    capture_trace(path)
+
+    # The replay server does not know acme's real key; replay maps it.
+    result = await replay(
+        load_trace(str(path)),
+        speed=100.0,
+        model_latency=False,
+        settings=Settings(GOOGLE_API_KEY="test"),
+    )
+
+    assert result["misses"] == 0
+    assert result["skipped"] == 0
+    assert result["statuses"] == {
+        ("create_agent", 200): 1,
+        ("chat", 200): 2,
+        ("delete_agent", 200): 1,
+    }
+    assert result["tenants"]["acme"]["turns"] == 2
+    assert "default" not in result["tenants"]
+    assert get_agent_factory not in app.dependency_overrides
@@ -2,6 +2,7 @@ import pytest
 
 from app.core.agent_factory import agent_factory
 from app.server.config import Settings
+from src.serde import Serializer
 
 
 def test_agent_factory_stateful_agent():
@@ -22,3 +23,20 @@ def test_agent_factory_unknown_agent():
     settings = Settings(GOOGLE_API_KEY="test")
     with pytest.raises(ValueError):
         agent_factory("unknown_agent", settings)
+
+
+def test_agent_factory_tool_output_offloading(tmp_path):
+    settings = Settings(
+        GOOGLE_API_KEY="test", TOOL_OUTPUT_MAX_CHARS=1000, TOOL_OUTPUT_DIR=str(tmp_path)
+    )
+    for template in ("stateful_agent", "stateful_deep_agent"):
+        runnable, _ = agent_factory(template, settings)
+        assert "read_tool_output" in runnable.nodes["tools"].bound.tools_by_name
+
+
+def test_agent_factory_checkpoint_serde_reaches_checkpointer():
+    settings = Settings(GOOGLE_API_KEY="test", CHECKPOINT_SERDE="msgpack")
+    runnable, _ = agent_factory("stateful_deep_agent", settings)
+    serde = runnable.checkpointer.serde
+    assert isinstance(serde, Serializer)
+    assert serde.backend == "msgpack"
@@ -0,0 +1,92 @@
+from deepagents.middleware.filesystem import FilesystemState
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import END, START, StateGraph
+
+from src.backends import BLOB_KEY, BlobStateBackend, BlobStore
+
+
+def test_blob_store_deduplicates(tmp_path):
+    store = BlobStore(tmp_path)
+    first = store.put(b"hello")
+    second = store.put(b"hello")
+    assert first == second
+    assert store.get(first) == b"hello"
+    assert store.read_text(store.put(b"")) == ""
+    assert len([p for p in tmp_path.rglob("*") if p.is_file()]) == 2
+
+
+async def test_state_holds_only_digests(tmp_path):
+    backend = BlobStateBackend(BlobStore(tmp_path))
+    body = "line\n" * 10_000
+
+    def write_then_read(state: FilesystemState):
+        backend.write("/notes.txt", body)
+        assert backend.read("/notes.txt", limit=1).file_data["content"] == "line\n"
+        return {}
+
+    def edit(state: FilesystemState):
+        backend.edit("/notes.txt", "line", "row", replace_all=True)
+        return {}
+
+    graph = StateGraph(FilesystemState)
+    graph.add_node("write_then_read", write_then_read)
+    graph.add_node("edit", edit)
+    graph.add_edge(START, "write_then_read")
+    graph.add_edge("write_then_read", "edit")
+    graph.add_edge("edit", END)
+    app = graph.compile(checkpointer=MemorySaver())
+
+    result = await app.ainvoke(
+        {"messages": []}, config={"configurable": {"thread_id": "t"}}
+    )
+
+    ref = result["files"]["/notes.txt"]
+    assert "content" not in ref
+    assert backend.store.read_text(ref[BLOB_KEY]) == "row\n" * 10_000
+
+
+class CountingStore(BlobStore):
+    def __init__(self, root):
+        super().__init__(root, cache_size=0)
+        self.reads = []
+
+    def get(self, digest: str) -> bytes:
+        self.reads.append(digest)
+        return super().get(digest)
+
+
+async def test_only_content_operations_read_blobs(tmp_path):
+    store = CountingStore(tmp_path)
+    backend = BlobStateBackend(store)
+    bodies = {"/a.txt": "é" * 100, "/b.txt": "b" * 300}
+
+    def write(state: FilesystemState):
+        for path, body in bodies.items():
+            backend.write(path, body)
+        return {}
+
+    def inspect(state: FilesystemState):
+        sizes = {info["path"]: info["size"] for info in backend.ls("/").entries}
+        assert sizes == {"/a.txt": 200, "/b.txt": 300}
+        matches = backend.glob("*.txt").matches
+        assert {info["path"]: info["size"] for info in matches} == sizes
+        backend.write("/b.txt", "new")
+        assert store.reads == []
+
+        assert backend.read("/a.txt").file_data["content"] == bodies["/a.txt"]
+        assert len(store.reads) == 1
+        assert [m["path"] for m in backend.grep("é").matches] == ["/a.txt"]
+        return {}
+
+    graph = StateGraph(FilesystemState)
+    graph.add_node("write", write)
+    graph.add_node("inspect", inspect)
+    graph.add_edge(START, "write")
+    graph.add_edge("write", "inspect")
+    graph.add_edge("inspect", END)
+    app = graph.compile(checkpointer=MemorySaver())
+
+    result = await app.ainvoke(
+        {"messages": []}, config={"configurable": {"thread_id": "t"}}
+    )
+    assert result["files"]["/b.txt"]["size"] == 3
@@ -0,0 +1,33 @@
+from app.core.capture import TrafficRecorder
+from benchmarks.replay import load_trace
+from src.fake_models import ReplayChatModel
+
+
+def test_recorder_writes_in_background(tmp_path):
+    path = tmp_path / "trace.jsonl"
+    recorder = TrafficRecorder(str(path))
+    recorder.record("create_agent", ts=1.0, agent_id="a")
+    recorder.record("delete_agent", ts=2.0, agent_id="a")
+    recorder.flush()
+
+    assert [e["event"] for e in load_trace(str(path))] == [
+        "create_agent",
+        "delete_agent",
+    ]
+    recorder.close()
+    assert not recorder._writer.is_alive()
+
+
+async def test_replay_model_serves_recording_then_misses():
+    model = ReplayChatModel(
+        calls=[
+            {
+                "latency": 5.0,
+                "message": {"type": "ai", "data": {"content": "hi", "type": "ai"}},
+            }
+        ],
+        replay_latency=False,
+    )
+    assert (await model.ainvoke("x")).content == "hi"
+    assert (await model.ainvoke("x")).content == ""
+    assert model.misses == 1
@@ -0,0 +1,158 @@
+import asyncio
+
+import pytest
+from deepagents._models import get_model_identifier, get_model_provider
+from langchain_core.callbacks import AsyncCallbackHandler
+from langchain_core.messages import HumanMessage
+from langchain_core.rate_limiters import InMemoryRateLimiter
+from langchain_google_genai import ChatGoogleGenerativeAI
+
+from app.core.capture import ModelCallCapture
+from src.fake_models import LatencyFakeChatModel
+from src.llm import HedgedChatModel, LatencyTracker, RetryBudget
+
+
+def warm_tracker(seconds: float, n: int = 20) -> LatencyTracker:
+    tracker = LatencyTracker(min_samples=n, floor=0.0)
+    for _ in range(n):
+        tracker.observe(seconds)
+    return tracker
+
+
+def test_tracker_deadline_needs_warmup():
+    tracker = LatencyTracker(min_samples=3)
+    tracker.observe(0.1)
+    assert tracker.deadline() is None
+    tracker.observe(0.2)
+    tracker.observe(0.3)
+    assert tracker.deadline() == pytest.approx(0.3)
+
+
+def test_retry_budget_drains_and_refills_from_requests():
+    budget = RetryBudget(ratio=0.5, min_per_second=0.0, max_tokens=1.0)
+    assert budget.try_withdraw() is True
+    assert budget.try_withdraw() is False
+    budget.deposit()
+    budget.deposit()
+    assert budget.try_withdraw() is True
+
+
+async def test_hedge_wins_when_primary_is_slow():
+    latencies = iter([1.0, 0.01])
+    inner = LatencyFakeChatModel(latency=lambda: next(latencies))
+    model = HedgedChatModel(
+        inner=inner,
+        tracker=warm_tracker(0.02),
+        budget=RetryBudget(min_per_second=0.0),
+    )
+
+    started = asyncio.get_running_loop().time()
+    result = await model.ainvoke([HumanMessage(content="hi")])
+    elapsed = asyncio.get_running_loop().time() - started
+
+    assert result.content == "ok"
+    assert elapsed < 0.5
+    assert model.stats["hedges"] == 1
+    assert model.stats["hedge_wins"] == 1
+
+
+async def test_no_hedge_when_budget_is_empty():
+    inner = LatencyFakeChatModel(latency=lambda: 0.05)
+    model = HedgedChatModel(
+        inner=inner,
+        tracker=warm_tracker(0.01),
+        budget=RetryBudget(ratio=0.0, min_per_second=0.0, max_tokens=0.0),
+    )
+
+    await model.ainvoke([HumanMessage(content="hi")])
+
+    assert inner.calls == 1
+    assert model.stats["hedges"] == 0
+    assert model.stats["budget_exhausted"] == 1
+
+
+async def test_retries_stop_when_budget_is_exhausted():
+    inner = LatencyFakeChatModel(error_rate=1.0)
+    model = HedgedChatModel(
+        inner=inner,
+        tracker=LatencyTracker(),
+        budget=RetryBudget(ratio=0.0, min_per_second=0.0, max_tokens=1.0),
+        max_retries=5,
+        backoff_base=0.0,
+    )
+
+    with pytest.raises(RuntimeError):
+        await model.ainvoke([HumanMessage(content="hi")])
+
+    assert inner.calls == 2
+    assert model.stats["retries"] == 1
+
+
+def test_hedged_model_keeps_inner_identity():
+    inner = ChatGoogleGenerativeAI(model="gemini-2.5-flash", google_api_key="test")
+    hedged = HedgedChatModel(inner=inner)
+
+    assert hedged.profile == inner.profile
+    assert hedged.profile["max_input_tokens"] == 1048576
+    assert get_model_identifier(hedged) == "gemini-2.5-flash"
+    assert get_model_provider(hedged) == get_model_provider(inner)
+
+
+class CountingLimiter(InMemoryRateLimiter):
+    acquired: int = 0
+
+    async def aacquire(self, *, blocking: bool = True) -> bool:
+        self.acquired += 1
+        return True
+
+
+class TokenRecorder(AsyncCallbackHandler):
+    def __init__(self):
+        self.runs = {}
+        self.tokens = []
+
+    async def on_chat_model_start(
+        self, serialized, messages, *, run_id, parent_run_id=None, **kwargs
+    ):
+        self.runs[run_id] = parent_run_id
+
+    async def on_llm_new_token(self, token, *, run_id, **kwargs):
+        self.tokens.append((token, run_id))
+
+
+async def test_hedged_calls_keep_callbacks_and_rate_limiter():
+    latencies = iter([1.0, 0.01])
+    limiter = CountingLimiter(requests_per_second=1000)
+    inner = LatencyFakeChatModel(
+        latency=lambda: next(latencies), rate_limiter=limiter
+    )
+    model = HedgedChatModel(
+        inner=inner,
+        tracker=warm_tracker(0.02),
+        budget=RetryBudget(min_per_second=0.0),
+    )
+    recorder, capture = TokenRecorder(), ModelCallCapture()
+
+    await model.ainvoke(
+        [HumanMessage(content="hi")], config={"callbacks": [recorder, capture]}
+    )
+
+    assert limiter.acquired == 2
+    # Traces record the hedge as part of the wrapper's call, not a second one.
+    assert len(capture.calls) == 1
+    (outer,) = [run for run, parent in recorder.runs.items() if parent is None]
+    (hedge,) = [run for run, parent in recorder.runs.items() if parent == outer]
+    # The winning hedge streamed into its own child run.
+    assert recorder.tokens == [("ok", hedge)]
+
+
+async def test_primary_call_streams_into_wrapper_run():
+    model = HedgedChatModel(inner=LatencyFakeChatModel(), tracker=LatencyTracker())
+    recorder = TokenRecorder()
+
+    await model.ainvoke(
+        [HumanMessage(content="hi")], config={"callbacks": [recorder]}
+    )
+
+    (outer,) = recorder.runs
+    assert recorder.tokens == [("ok", outer)]
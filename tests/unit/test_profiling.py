@@ -0,0 +1,86 @@
+import asyncio
+import time
+
+from langchain.agents import create_agent
+from langchain.tools import tool
+from langchain_core.messages import AIMessage
+
+from src.fake_models import ScriptedChatModel, tool_call_message
+from src.profiling import OTHER_TASKS, TurnProfiler
+from src.session import AgentSession
+
+
+@tool
+def busy_tool() -> str:
+    """Burn CPU for a moment."""
+    deadline = time.monotonic() + 0.05
+    while time.monotonic() < deadline:
+        pass
+    return "done"
+
+
+def boundaries(profiler: TurnProfiler) -> set[str]:
+    prefixes = ("node:", "tool:", "model_call")
+    return {
+        ";".join(f for f in stack.split(";") if f.startswith(prefixes))
+        for stack in profiler.samples
+    }
+
+
+async def test_profile_tags_nodes_and_tools():
+    model = ScriptedChatModel(
+        script=[tool_call_message("busy_tool"), AIMessage(content="finished")],
+        latency=lambda: 0.05,
+    )
+    agent = create_agent(model=model, tools=[busy_tool])
+    session = AgentSession(session_id="s", agent_runnable=agent)
+
+    with TurnProfiler(interval=0.002) as profiler:
+        reply = await session.chat("hi", callbacks=[profiler])
+
+    assert reply == "finished"
+    assert "node:model;model_call" in boundaries(profiler)
+    assert "node:tools;tool:busy_tool" in boundaries(profiler)
+    # The sync tool runs in an executor thread; its own frame must be sampled
+    # under its boundary, not just the event loop waiting for it.
+    assert any(
+        stack.startswith("node:tools;tool:busy_tool;") and "busy_tool (" in stack
+        for stack in profiler.samples
+    )
+    line = profiler.collapsed().splitlines()[0]
+    assert line.rsplit(" ", 1)[1].isdigit()
+
+
+@tool
+async def other_busy_tool() -> str:
+    """Burn CPU on the event loop in short slices."""
+    for _ in range(5):
+        deadline = time.monotonic() + 0.03
+        while time.monotonic() < deadline:
+            pass
+        await asyncio.sleep(0)
+    return "done"
+
+
+async def test_other_sessions_are_not_attributed_to_the_turn():
+    def session(name, tool_name, tools):
+        model = ScriptedChatModel(
+            script=[tool_call_message(tool_name), AIMessage(content="finished")],
+            latency=lambda: 0.02,
+        )
+        return AgentSession(name, create_agent(model=model, tools=tools))
+
+    profiled = session("profiled", "busy_tool", [busy_tool])
+    other = session("other", "other_busy_tool", [other_busy_tool])
+    # Started before the profiled turn, like another client's request.
+    background = asyncio.create_task(other.chat("hi"))
+    await asyncio.sleep(0)
+
+    with TurnProfiler(interval=0.002) as profiler:
+        await profiled.chat("hi", callbacks=[profiler])
+    await background
+
+    other_stacks = [s for s in profiler.samples if "other_busy_tool (" in s]
+    assert other_stacks
+    assert all(s.startswith(f"{OTHER_TASKS};") for s in other_stacks)
+    assert "node:tools;tool:busy_tool" in boundaries(profiler)
@@ -0,0 +1,100 @@
+import importlib.util
+import math
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import END, START, MessagesState, StateGraph
+from langgraph.types import Send
+from pydantic import ValidationError
+
+from app.server.config import Settings
+from src.serde import Serializer, make_serializer
+
+
+def sample_state():
+    return {
+        "messages": [
+            HumanMessage(content="hi"),
+            AIMessage(
+                content="",
+                tool_calls=[{"name": "get_user_info", "args": {}, "id": "1"}],
+            ),
+            ToolMessage(content="User is John", tool_call_id="1"),
+        ],
+        "user_name": "John",
+    }
+
+
+@pytest.mark.parametrize("backend", ["msgpack", "orjson", "jsonplus"])
+def test_roundtrip(backend):
+    serde = Serializer(backend=backend)
+    type_, data = serde.dumps_typed(sample_state())
+    assert serde.loads_typed((type_, data)) == sample_state()
+
+
+def test_unsupported_types_fall_back():
+    serde = Serializer(backend="orjson")
+    type_, data = serde.dumps_typed(Send("node", {"a": 1}))
+    assert type_ == "msgpack"
+    assert serde.loads_typed((type_, data)) == Send("node", {"a": 1})
+
+
+def test_orjson_keeps_non_finite_floats():
+    serde = Serializer(backend="orjson")
+    message = AIMessage(content="x", additional_kwargs={"score": math.nan})
+    type_, data = serde.dumps_typed({"messages": [message], "inf": math.inf})
+
+    # JSON has no NaN/Infinity, so the payload goes to the fallback.
+    assert not type_.startswith("lc-")
+    restored = serde.loads_typed((type_, data))
+    assert math.isnan(restored["messages"][0].additional_kwargs["score"])
+    assert restored["inf"] == math.inf
+
+
+def test_large_payloads_are_compressed():
+    serde = Serializer(backend="msgpack", compress_threshold=1024)
+    state = {"messages": [HumanMessage(content="x" * 4096)]}
+    type_, data = serde.dumps_typed(state)
+    assert type_.endswith("+zstd")
+    assert len(data) < 1024
+    assert serde.loads_typed((type_, data)) == state
+
+
+def test_make_serializer_keeps_default():
+    assert make_serializer("jsonplus") is None
+    with pytest.raises(ValueError):
+        make_serializer("pickle")
+
+
+def test_settings_reject_bad_serde_config(monkeypatch):
+    with pytest.raises(ValidationError):
+        Settings(GOOGLE_API_KEY="test", CHECKPOINT_SERDE="msgpak")
+
+    find_spec = importlib.util.find_spec
+    monkeypatch.setattr(
+        importlib.util,
+        "find_spec",
+        lambda name, *a: None if name == "zstandard" else find_spec(name, *a),
+    )
+    with pytest.raises(ValidationError, match="zstandard"):
+        Settings(GOOGLE_API_KEY="test", CHECKPOINT_COMPRESS_THRESHOLD=1024)
+
+
+async def test_checkpointer_uses_serializer():
+    def echo(state: MessagesState):
+        return {"messages": [AIMessage(content="echo")]}
+
+    graph = StateGraph(MessagesState)
+    graph.add_node("echo", echo)
+    graph.add_edge(START, "echo")
+    graph.add_edge("echo", END)
+    app = graph.compile(checkpointer=MemorySaver(serde=Serializer("orjson")))
+
+    config = {"configurable": {"thread_id": "t"}}
+    await app.ainvoke({"messages": [HumanMessage(content="one")]}, config=config)
+    result = await app.ainvoke(
+        {"messages": [HumanMessage(content="two")]}, config=config
+    )
+
+    assert [m.content for m in result["messages"]] == ["one", "echo", "two", "echo"]
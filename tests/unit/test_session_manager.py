@@ -1,7 +1,10 @@
 import pytest
 from langchain_core.runnables import Runnable
 
+from app.core.agent_factory import agent_factory
 from app.core.session_manager import SessionManager
+from app.server.config import Settings
+from src.fake_models import LatencyFakeChatModel
 
 
 class MockRunnable(Runnable):
@@ -48,3 +51,30 @@ def test_delete_session(manager: SessionManager):
     assert manager.delete_session(agent_id) is True
     assert manager.get_session(agent_id) is None
     assert manager.delete_session("unknown_id") is False
+
+
+def test_sessions_are_scoped_to_tenant(manager: SessionManager):
+    runnable = MockRunnable()
+    agent_id = manager.create_session(runnable, "agent", tenant="acme")
+    assert manager.get_session(agent_id, "acme") is not None
+    assert manager.get_session(agent_id, "other") is None
+    assert manager.list_sessions("other") == []
+    assert manager.delete_session(agent_id, "other") is False
+    assert manager.delete_session(agent_id, "acme") is True
+
+
+async def test_deep_sessions_share_graph_but_not_threads(manager: SessionManager):
+    model = LatencyFakeChatModel(reply="hi")
+    graph, agent_type = agent_factory(
+        "stateful_deep_agent", Settings(GOOGLE_API_KEY="test"), model=model
+    )
+    kept = manager.create_session(graph, agent_type)
+    dropped = manager.create_session(graph, agent_type)
+    for agent_id in (kept, dropped):
+        await manager.get_session(agent_id).chat("hello")
+
+    manager.delete_session(dropped)
+
+    threads = {key for key in graph.checkpointer.storage}
+    assert kept in threads and dropped not in threads
+    assert len(manager.get_session(kept).messages) == 2
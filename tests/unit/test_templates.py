@@ -0,0 +1,84 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from app.core.agent_factory import agent_factory
+from app.core.templates import TemplateRegistry
+from app.server.config import Settings
+
+
+def write_manifest(tmp_path, graphs):
+    path = tmp_path / "langgraph.json"
+    path.write_text(json.dumps({"graphs": graphs}))
+    return str(path)
+
+
+def test_repo_manifest_templates_all_compile():
+    registry = TemplateRegistry.from_manifest("langgraph.json")
+    registry.warm(Settings(GOOGLE_API_KEY="test"))
+
+    ready = {info.name: info for info in registry.ready()}
+    assert set(ready) == {"stateful_agent", "stateful_deep_agent"}
+    assert ready["stateful_agent"].agent_type == "agent"
+    assert ready["stateful_deep_agent"].agent_type == "deepagent"
+    assert all(info.compile_seconds > 0 for info in ready.values())
+
+
+def test_invalid_entries_are_marked_failed(tmp_path):
+    manifest = write_manifest(
+        tmp_path,
+        {
+            "moved": "./src/stateful_agent.py:make_graph",
+            "stateful_agent": "./src/agents/stateful_agent.py:agent",
+        },
+    )
+    registry = TemplateRegistry.from_manifest(manifest)
+    # Resolve file paths against the repo, not the temp manifest's directory.
+    registry.root = Path(".")
+    registry.warm(Settings(GOOGLE_API_KEY="test"))
+
+    assert registry.ready() == []
+    assert "./src/agents/moved.py" in registry.templates["moved"].error
+    assert "no attribute 'agent'" in registry.templates["stateful_agent"].error
+    with pytest.raises(ValueError, match="unavailable"):
+        registry.check("stateful_agent")
+
+
+def test_check_rejects_templates_missing_from_manifest(tmp_path):
+    manifest = write_manifest(
+        tmp_path, {"stateful_agent": "./src/agents/stateful_agent.py:make_graph"}
+    )
+    registry = TemplateRegistry.from_manifest(manifest)
+
+    # Not yet warmed: still allowed, built lazily.
+    registry.check("stateful_agent")
+    with pytest.raises(ValueError, match="Unknown agent template"):
+        registry.check("stateful_deep_agent")
+
+
+def test_build_reuses_warm_graphs(tmp_path):
+    calls = []
+
+    def counting_factory(name, settings):
+        calls.append(name)
+        return agent_factory(name, settings)
+
+    manifest = write_manifest(
+        tmp_path, {"stateful_agent": "./src/agents/stateful_agent.py:make_graph"}
+    )
+    registry = TemplateRegistry.from_manifest(manifest)
+    registry.root = Path(".")
+    registry.factory = counting_factory
+    settings = Settings(GOOGLE_API_KEY="test")
+    registry.warm(settings)
+
+    first, _ = registry.build("stateful_agent", settings)
+    second, _ = registry.build("stateful_agent", settings)
+    assert first is second
+    assert calls == ["stateful_agent"]
+
+    # Other settings may change how the graph is built, so build afresh.
+    other, _ = registry.build("stateful_agent", Settings(GOOGLE_API_KEY="test"))
+    assert other is not first
+    assert calls == ["stateful_agent"] * 2
@@ -0,0 +1,125 @@
+import re
+
+import pytest
+from langchain.agents import create_agent
+from langchain.tools import ToolRuntime, tool
+from langchain_core.messages import AIMessage, ToolMessage
+from langgraph.types import Command
+from pydantic import ValidationError
+
+from app.server.config import Settings
+from src.backends import BlobStore
+from src.fake_models import ScriptedChatModel, tool_call_message
+from src.session import AgentSession
+from src.tool_outputs import READ_TOOL_NAME, ToolOutputOffloader, offload_stats
+
+REPORT = "".join(f"line {i:05d}\n" for i in range(2000))  # 22k chars
+
+
+@tool
+def fetch_report() -> str:
+    """Return the full report."""
+    return REPORT
+
+
+@tool
+def fetch_report_command(runtime: ToolRuntime) -> Command:
+    """Return the full report as a state update."""
+    message = ToolMessage(REPORT, tool_call_id=runtime.tool_call_id)
+    return Command(update={"messages": [message]})
+
+
+def read_second_page(messages) -> AIMessage:
+    handle = re.search(r'handle="(\w+)"', str(messages[-1].content)).group(1)
+    args = {"handle": handle, "offset": 1000}
+    return tool_call_message(READ_TOOL_NAME, args, call_id="call-2")
+
+
+def make_session(tmp_path):
+    # Fetches the report, reads its second page, then answers.
+    model = ScriptedChatModel(
+        script=[
+            tool_call_message("fetch_report"),
+            read_second_page,
+            AIMessage(content="done"),
+        ]
+    )
+    offloader = ToolOutputOffloader(BlobStore(tmp_path), max_chars=1000)
+    agent = create_agent(model=model, tools=[fetch_report], middleware=[offloader])
+    return AgentSession("s1", agent), model
+
+
+async def test_large_results_are_truncated_and_readable(tmp_path):
+    session, model = make_session(tmp_path)
+    assert await session.chat("summarise the report") == "done"
+
+    tools = [m for m in session.state["messages"] if isinstance(m, ToolMessage)]
+    truncated, page = tools
+    assert truncated.content.startswith(REPORT[:1000])
+    assert len(truncated.content) < 1200
+    assert page.content.startswith(REPORT[1000:2000])
+    # The full report never reached the model.
+    assert max(model.prompt_chars()) < 2 * 1200
+    stats = session.tool_output_stats()
+    assert stats["offloaded"] == 1
+    assert stats["prompt_tokens_saved"] > 0
+
+
+def test_stats_count_later_model_calls(tmp_path):
+    offloader = ToolOutputOffloader(BlobStore(tmp_path), max_chars=1000)
+    small = ToolMessage(content="ok", tool_call_id="a", name="fetch_report")
+    big = offloader._offload(
+        ToolMessage(content=REPORT, tool_call_id="b", name="fetch_report")
+    )
+    history = [small, big, AIMessage(content="x"), AIMessage(content="y")]
+
+    stats = offload_stats(history)
+    meta = big.response_metadata["offloaded"]
+    assert offloader.store.read_text(meta["handle"]) == REPORT
+    assert stats["offloaded"] == 1
+    assert stats["bytes_saved"] == len(REPORT) - len(big.content)
+    removed = meta["chars"] - meta["inline_chars"]
+    assert stats["prompt_tokens_saved"] == removed // 4 * 2
+
+
+def test_read_tool_rejects_bad_handles(tmp_path):
+    offloader = ToolOutputOffloader(BlobStore(tmp_path), max_chars=1000)
+    read = offloader.tools[0]
+    assert read.invoke({"handle": "../../etc/passwd"}).startswith("Invalid handle")
+    assert read.invoke({"handle": "0" * 64}).startswith("No stored tool output")
+
+
+def test_read_tool_bounds_offset_and_limit(tmp_path):
+    offloader = ToolOutputOffloader(BlobStore(tmp_path), max_chars=1000)
+    read = offloader.tools[0]
+    handle = offloader.store.put(REPORT.encode("utf-8"))
+
+    page = read.invoke({"handle": handle, "offset": -11, "limit": 11})
+    assert page.startswith("line 00000\n\n\n[")
+    assert read.invoke({"handle": handle, "limit": 0}).startswith("Invalid limit")
+    assert read.invoke({"handle": handle, "limit": -5}).startswith("Invalid limit")
+    with pytest.raises(ValidationError):
+        Settings(GOOGLE_API_KEY="test", TOOL_OUTPUT_MAX_CHARS=0)
+
+
+async def test_command_results_are_truncated(tmp_path):
+    offloader = ToolOutputOffloader(BlobStore(tmp_path), max_chars=1000)
+    agent = create_agent(
+        model=ScriptedChatModel(
+            script=[
+                tool_call_message("fetch_report_command"),
+                AIMessage(content="done"),
+            ]
+        ),
+        tools=[fetch_report_command],
+        middleware=[offloader],
+    )
+    session = AgentSession("s1", agent)
+    assert await session.chat("summarise the report") == "done"
+
+    (result,) = [m for m in session.state["messages"] if isinstance(m, ToolMessage)]
+    assert result.content.startswith(REPORT[:1000])
+    assert len(result.content) < 1200
+    handle = result.response_metadata["offloaded"]["handle"]
+    assert offloader.store.read_text(handle) == REPORT
+    assert session.tool_output_stats()["offloaded"] == 1